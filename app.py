@@ -1,15 +1,41 @@
 #!/usr/bin/env python3
-from flask import Flask, render_template, request, jsonify
-from database import init_database, create_extraction, get_extraction, get_all_extractions
+from flask import Flask, Response, render_template, request, jsonify
+from database import (init_database, create_extraction, get_extraction, get_all_extractions, count_pending_extractions,
+                      get_extraction_progress, listen_events, decode_cursor, LISTEN_CONFIGURED)
+from events import extraction_events
 from worker import worker
 import os
+import json
+import queue
 import atexit
+import multiprocessing
+
+# Fila máxima de extrações pendentes; acima disso novas submissões recebem 429
+EXTRACTION_QUEUE_LIMIT = int(os.getenv("EXTRACTION_QUEUE_LIMIT", "100"))
+QUEUE_RETRY_AFTER = 30  # segundos sugeridos ao cliente no Retry-After
+SSE_KEEPALIVE = 15  # segundos entre comentários de keepalive em streams ociosos
+# Sem LISTEN confiável (eventos de outras réplicas não chegam), o stream relê status e
+# progresso no banco nesse intervalo
+SSE_FALLBACK_REFRESH = 5
+FINAL_STATUSES = ('completed', 'failed')
+EXTRACTIONS_PAGE_MAX = 100  # itens por página em /api/extractions
 
 app = Flask(__name__)
 
-with app.app_context():
-    init_database()
-    worker.start()
+def start_services():
+    """Banco, worker e eventos; sobe no import, para valer em qualquer servidor WSGI
+
+    Os processos de parse (spawn) reimportam o script principal: neles (processos filhos
+    do multiprocessing) nada é iniciado, senão cada um viraria um worker.
+    """
+    if multiprocessing.parent_process() is not None:
+        return
+    with app.app_context():
+        init_database()
+        worker.start()
+        extraction_events.start_listener(listen_events)
+
+start_services()
 
 @app.route('/')
 def index():
@@ -27,20 +53,39 @@ def extract():
         if not start_url or not api_base_url:
             return jsonify({'error': 'Campos obrigatórios não preenchidos'}), 400
         
-        extraction_id = create_extraction({
+        pending = count_pending_extractions()
+        if pending is not None and pending >= EXTRACTION_QUEUE_LIMIT:
+            response = jsonify({
+                'error': 'Fila de extrações cheia, tente novamente em instantes',
+                'pending': pending
+            })
+            response.headers['Retry-After'] = str(QUEUE_RETRY_AFTER)
+            return response, 429
+        
+        extraction = create_extraction({
             'startUrl': start_url,
             'toolName': tool_name,
             'apiBaseUrl': api_base_url
         })
         
-        if not extraction_id:
+        if not extraction:
             return jsonify({'error': 'Erro ao criar extração no banco de dados'}), 500
         
+        if extraction['status'] == 'completed':
+            message = 'Resultado reaproveitado de uma extração idêntica recente'
+        elif extraction['reused_from']:
+            message = 'Extração idêntica já em andamento; esta receberá o mesmo resultado'
+        else:
+            message = 'Extração adicionada à fila de processamento'
+            worker.notify()
+        
         return jsonify({
             'success': True,
-            'message': 'Extração adicionada à fila de processamento',
-            'extraction_id': extraction_id,
-            'status': 'pending'
+            'message': message,
+            'extraction_id': extraction['id'],
+            'status': extraction['status'],
+            'reused_from': extraction['reused_from'],
+            'output_path': extraction['output_path']
         })
     
     except Exception as e:
@@ -56,6 +101,8 @@ def get_extraction_status(extraction_id):
         if not extraction:
             return jsonify({'error': 'Extração não encontrada'}), 404
         
+        extraction['progress'] = get_extraction_progress(extraction_id)
+        
         return jsonify({
             'success': True,
             'extraction': extraction
@@ -66,17 +113,96 @@ def get_extraction_status(extraction_id):
             'error': str(e)
         }), 500
 
+def _sse(event_type: str, data) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.route('/api/extraction/<int:extraction_id>/events', methods=['GET'])
+def extraction_events_stream(extraction_id):
+    """Status e progresso em tempo real (Server-Sent Events), sem polling no banco"""
+    # Assina antes de ler o estado inicial: nada publicado entre os dois se perde
+    subscription = extraction_events.subscribe(extraction_id)
+    extraction = get_extraction(extraction_id)
+    
+    if not extraction:
+        extraction_events.unsubscribe(extraction_id, subscription)
+        return jsonify({'error': 'Extração não encontrada'}), 404
+    
+    extraction['progress'] = get_extraction_progress(extraction_id)
+    
+    def stream():
+        try:
+            yield _sse('status', extraction)
+            status = extraction['status']
+            progress_at = (extraction['progress'] or {}).get('updated_at')
+            
+            while status not in FINAL_STATUSES:
+                # Sem LISTEN_DATABASE_URL o LISTEN passa pelo pooler, que aceita o comando mas não
+                # repassa notificações: "conectado" não garante nada, então relê no banco
+                relayed = LISTEN_CONFIGURED and extraction_events.connected
+                try:
+                    event = subscription.get(timeout=SSE_KEEPALIVE if relayed else SSE_FALLBACK_REFRESH)
+                except queue.Empty:
+                    if not relayed:
+                        current = get_extraction(extraction_id)
+                        if current and current['status'] != status:
+                            status = current['status']
+                            yield _sse('status', current)
+                        current_progress = get_extraction_progress(extraction_id)
+                        if current_progress and current_progress.get('updated_at') != progress_at:
+                            progress_at = current_progress.get('updated_at')
+                            yield _sse('progress', current_progress)
+                    yield ": keepalive\n\n"
+                    continue
+                
+                data = event.get('data')
+                if data is None:
+                    # Evento grande demais para o NOTIFY chega sem os dados: lê o estado no banco
+                    if event['type'] == 'status':
+                        data = get_extraction(extraction_id)
+                    else:
+                        data = get_extraction_progress(extraction_id)
+                    if data is None:
+                        continue
+                yield _sse(event['type'], data)
+                if event['type'] == 'status':
+                    status = data.get('status', status)
+        finally:
+            extraction_events.unsubscribe(extraction_id, subscription)
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/extractions', methods=['GET'])
 def list_extractions():
     try:
-        limit = request.args.get('limit', 50, type=int)
-        extractions = get_all_extractions(limit=limit)
+        limit = min(max(request.args.get('limit', 50, type=int), 1), EXTRACTIONS_PAGE_MAX)
         
-        return jsonify({
+        after = None
+        if request.args.get('cursor'):
+            try:
+                after = decode_cursor(request.args['cursor'])
+            except ValueError:
+                return jsonify({'error': 'Cursor inválido'}), 400
+        
+        extractions, next_cursor = get_all_extractions(
+            limit=limit,
+            after=after,
+            status=request.args.get('status') or None,
+            tool_name=request.args.get('toolName') or None
+        )
+        
+        response = jsonify({
             'success': True,
             'extractions': extractions,
-            'count': len(extractions)
+            'count': len(extractions),
+            'next_cursor': next_cursor
         })
+        # ETag do conteúdo: página inalterada responde 304 sem corpo
+        response.headers['Cache-Control'] = 'no-cache'
+        response.add_etag()
+        return response.make_conditional(request)
     
     except Exception as e:
         return jsonify({
@@ -89,9 +215,8 @@ def cleanup():
 atexit.register(cleanup)
 
 if __name__ == '__main__':
-    init_database()
-    worker.start()
     try:
-        app.run(debug=True, port=5000)
+        # Sem o reloader: ele reimporta o app em outro processo (dois workers)
+        app.run(debug=True, port=5000, use_reloader=False)
     finally:
         cleanup()
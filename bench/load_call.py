@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Teste de carga do POST /api/call
+Compara o caminho antigo (um subprocess.run por chamada, bloqueando o event loop) com o
+atual (pool de processos MCP persistentes) usando um servidor MCP stdio de teste.
+
+Uso: python bench/load_call.py [--requests 200] [--concurrency 20] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Servidor MCP mínimo: JSON-RPC por linha no stdin, requisições atendidas em paralelo.
+# A latência de cada tool simula a chamada à API externa; importa httpx como os servidores gerados.
+STUB_SERVER = '''
+import asyncio, json, sys
+import httpx  # noqa: F401
+
+LATENCY = {latency}
+
+async def handle(message):
+    if message.get("method") == "initialize":
+        result = {"protocolVersion": "2024-11-05", "capabilities": {"tools": {}},
+                  "serverInfo": {"name": "stub", "version": "1.0"}}
+    else:
+        await asyncio.sleep(LATENCY)
+        result = {"content": [{"type": "text", "text": json.dumps(message["params"])}]}
+    sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}) + "\\n")
+    sys.stdout.flush()
+
+async def main():
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    tasks = set()
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        message = json.loads(line)
+        if "id" in message:
+            task = asyncio.ensure_future(handle(message))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+asyncio.run(main())
+'''
+
+
+class ToolCall(BaseModel):
+    server_name: str
+    tool_name: str
+    arguments: Dict
+
+
+def legacy_app(server: Dict) -> FastAPI:
+    """Handler do /api/call antes do pool: um processo novo por chamada, síncrono"""
+    app = FastAPI()
+
+    @app.post("/api/call")
+    async def call_tool(tool_call: ToolCall):
+        try:
+            proc = subprocess.run(
+                [sys.executable, server['path']],
+                input=json.dumps({
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "method": "tools/call",
+                    "params": {"name": tool_call.tool_name, "arguments": tool_call.arguments}
+                }).encode(),
+                capture_output=True,
+                timeout=30
+            )
+            if proc.returncode == 0:
+                return json.loads(proc.stdout.decode())
+            raise HTTPException(status_code=500, detail=f"Erro ao executar tool: {proc.stderr.decode()}")
+        except subprocess.TimeoutExpired:
+            raise HTTPException(status_code=504, detail="Timeout ao executar tool")
+
+    return app
+
+
+def pooled_app(registry_file: Path) -> FastAPI:
+    """gateway_server atual, lendo o registro de teste"""
+    os.environ["REGISTRY_FILE"] = str(registry_file)
+    sys.path.insert(0, str(ROOT))
+    import gateway_server
+    return gateway_server.app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class BackgroundServer:
+    def __init__(self, app: FastAPI):
+        self.port = free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        return f"http://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def load(base_url: str, total: int, concurrency: int) -> Dict:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/call", json={
+                    "server_name": "stub", "tool_name": "echo", "arguments": {"i": i}
+                })
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        # Aquecimento: no caminho novo, sobe o processo do pool antes de medir
+        await one(-1)
+        latencies.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="latência simulada de cada tool (s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        stub = workdir / "stub" / "server.py"
+        stub.parent.mkdir()
+        # O pool executa `python server.py` sem argumentos: a latência vai embutida no arquivo
+        stub.write_text(STUB_SERVER.replace("{latency}", repr(args.latency)))
+        server = {"name": "stub", "path": str(stub), "directory": str(stub.parent)}
+        registry_file = workdir / "mcp_registry.json"
+        registry_file.write_text(json.dumps({"servers": [server]}))
+
+        results = {}
+        for name, app in (("antigo (subprocess por chamada)", legacy_app(server)),
+                          ("atual (pool persistente)", pooled_app(registry_file))):
+            with BackgroundServer(app) as base_url:
+                results[name] = asyncio.run(load(base_url, args.requests, args.concurrency))
+
+    print(f"\n{args.requests} chamadas, {args.concurrency} simultâneas, latência da tool {args.latency}s\n")
+    print(f"{'caminho':34} {'req/s':>8} {'p50 (s)':>9} {'p95 (s)':>9} {'total (s)':>10} {'erros':>6}")
+    for name, r in results.items():
+        print(f"{name:34} {r['throughput']:8.1f} {r['p50']:9.3f} {r['p95']:9.3f} {r['elapsed']:10.2f} {r['errors']:6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos backends de parsing HTML (HTML_PARSER em main.py)
+Mede o parse_page completo (árvore + links + endpoints) de uma página de documentação
+em cada backend disponível e confere que todos extraem os mesmos links e endpoints.
+A página padrão é sintética (ver o comentário no início dela); para medir o layout real,
+passe em --page uma página salva do site de documentação.
+
+Uso: python bench/parse_backends.py [--page tests/fixtures/docs_labels_page.html] [--repeat 20]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import main  # noqa: E402
+
+DEFAULT_PAGE = ROOT / "tests" / "fixtures" / "docs_labels_page.html"
+PAGE_URL = "https://docs.github.com/en/rest/issues/labels"
+BASE_URL = "https://docs.github.com"
+
+
+def available_backends():
+    for backend, module in main.HTML_PARSER_BACKENDS:
+        if module is not None:
+            try:
+                __import__(module)
+            except ImportError:
+                print(f"  {backend}: não instalado, ignorado")
+                continue
+        yield backend
+
+
+def measure(backend: str, content: bytes, repeat: int):
+    main.HTML_PARSER = backend
+    result = main.parse_page(PAGE_URL, content, BASE_URL)  # aquecimento
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        main.parse_page(PAGE_URL, content, BASE_URL)
+        timings.append(time.perf_counter() - started)
+    return result, timings
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--page", type=Path, default=DEFAULT_PAGE)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    content = args.page.read_bytes()
+    print(f"\n{args.page.name}: {len(content) / 1024:.0f} KB, {args.repeat} repetições\n")
+    print(f"{'backend':12} {'mediana (ms)':>13} {'mínimo (ms)':>12} {'links':>6} {'endpoints':>10}")
+
+    results = {}
+    for backend in available_backends():
+        result, timings = measure(backend, content, args.repeat)
+        results[backend] = result
+        links, endpoints = result
+        print(f"{backend:12} {statistics.median(timings) * 1000:13.1f} {min(timings) * 1000:12.1f} "
+              f"{len(links):6d} {len(endpoints):10d}")
+
+    reference = next(iter(results.values()), None)
+    divergent = [backend for backend, result in results.items() if result != reference]
+    if divergent:
+        print(f"\n⚠️ Resultado diferente do primeiro backend: {', '.join(divergent)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_bench()
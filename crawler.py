@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Crawler assíncrono de documentação
+BFS iterativo com concorrência limitada, cortesia por host e conexões reaproveitadas
+"""
+import asyncio
+import os
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Tuple
+
+import httpx
+
+from http_cache import HTTPCache
+from rate_limit import HostRateLimiter, rate_limiter
+
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "0")) or None
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "0")) or None
+CRAWL_MAX_BYTES = int(os.getenv("CRAWL_MAX_BYTES", "0")) or None  # total baixado por crawl
+CRAWL_TIMEOUT = 10.0
+
+USER_AGENT = "Flow-API-Extractor/1.0"
+
+# Recebe (url, corpo) e retorna (links a seguir, dados da página); precisa ser picklable
+# quando executado em um pool de processos
+PageParser = Callable[[str, bytes], Tuple[List[str], Any]]
+
+
+class AsyncCrawler:
+    """Percorre a documentação em largura, nível a nível, com N downloads simultâneos
+
+    O parse das páginas roda no executor informado (ex.: ProcessPoolExecutor), de forma
+    que os downloads continuam enquanto páginas anteriores são processadas. on_page recebe
+    (posição no crawl, url, dados) assim que cada página fica pronta, inclusive as que
+    falharam (dados None), e pode bloquear para segurar o crawl.
+    """
+
+    def __init__(self, page_parser: PageParser, concurrency: int = CRAWL_CONCURRENCY,
+                 limiter: HostRateLimiter = rate_limiter, max_depth: Optional[int] = CRAWL_MAX_DEPTH,
+                 max_pages: Optional[int] = CRAWL_MAX_PAGES, timeout: float = CRAWL_TIMEOUT,
+                 visited: Optional[set] = None, cache: Optional[HTTPCache] = None,
+                 executor: Optional[Executor] = None,
+                 on_page: Optional[Callable[[int, str, Any], None]] = None,
+                 max_bytes: Optional[int] = CRAWL_MAX_BYTES):
+        self.page_parser = page_parser
+        self.concurrency = max(1, concurrency)
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.bytes_fetched = 0
+        self.timeout = timeout
+        self.limiter = limiter
+        self.visited: set = visited if visited is not None else set()
+        self.cache = cache
+        self.executor = executor
+        self.on_page = on_page
+
+    def crawl(self, start_url: str) -> List[str]:
+        """Executa o crawl em um event loop próprio (uso a partir de código síncrono)"""
+        return asyncio.run(self.crawl_async(start_url))
+
+    async def crawl_async(self, start_url: str) -> List[str]:
+        pages: List[str] = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(
+            max_connections=self.concurrency,
+            max_keepalive_connections=self.concurrency
+        )
+
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits, follow_redirects=True,
+                                     headers={"User-Agent": USER_AGENT}) as client:
+            frontier = [start_url]
+            self.visited.add(start_url)
+            depth = 0
+
+            while frontier:
+                if self.max_pages is not None:
+                    frontier = frontier[:self.max_pages - len(pages)]
+                first_index = len(pages)
+                pages.extend(frontier)
+
+                results = await asyncio.gather(*[
+                    self._visit(client, semaphore, index, url)
+                    for index, url in enumerate(frontier, first_index)
+                ])
+
+                if self.max_depth is not None and depth >= self.max_depth:
+                    break
+                if self.max_pages is not None and len(pages) >= self.max_pages:
+                    break
+                if self._over_budget():
+                    print(f"  ⚠️ Limite de {self.max_bytes} bytes atingido, encerrando o crawl")
+                    break
+
+                # Próximo nível na ordem em que os links aparecem: resultado determinístico
+                next_frontier = []
+                for links in results:
+                    for link in links:
+                        if link not in self.visited:
+                            self.visited.add(link)
+                            next_frontier.append(link)
+
+                frontier = next_frontier
+                depth += 1
+
+        return pages
+
+    async def _visit(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                     index: int, url: str) -> List[str]:
+        async with semaphore:
+            if self._over_budget():
+                # Páginas restantes do nível são reportadas como falhas, sem download
+                content = None
+            else:
+                content = await self._fetch(client, url)
+
+        links, data = [], None
+        if content is not None:
+            # Parse fora do semáforo: o slot de download fica livre para a próxima página
+            try:
+                links, data = await self._parse(url, content)
+            except Exception as e:
+                print(f"  ⚠️ Erro ao processar {url}: {e}")
+
+        if self.on_page:
+            self.on_page(index, url, data)
+        return links
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> Optional[bytes]:
+        print(f"   Visitando: {url}")
+        try:
+            if self.cache:
+                _, content = await self.cache.fetch_async(client, url, before_request=self.limiter.acquire_async)
+            else:
+                await self.limiter.acquire_async(url)
+                content = (await client.get(url)).content
+        except Exception as e:
+            print(f"  ⚠️ Erro ao acessar {url}: {e}")
+            return None
+        self.bytes_fetched += len(content)
+        return content
+
+    def _over_budget(self) -> bool:
+        return self.max_bytes is not None and self.bytes_fetched >= self.max_bytes
+
+    async def _parse(self, url: str, content: bytes) -> Tuple[List[str], Any]:
+        if self.executor is None:
+            return self.page_parser(url, content)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.page_parser, url, content)
+        except BrokenProcessPool:
+            # Processo do pool morreu (ex.: falta de memória): processa aqui mesmo
+            print(f"  ⚠️ Pool de parse indisponível, processando {url} localmente")
+            return self.page_parser(url, content)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Cache persistente de descrições geradas pelo LLM
+SQLite compartilhado por todos os jobs e execuções, com validade (TTL) e limite de entradas
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+DESCRIPTION_CACHE_PATH = os.getenv("DESCRIPTION_CACHE_PATH", "./.description_cache.sqlite3")
+DESCRIPTION_CACHE_TTL = float(os.getenv("DESCRIPTION_CACHE_TTL", str(30 * 24 * 3600)))  # segundos
+DESCRIPTION_CACHE_MAX_ENTRIES = int(os.getenv("DESCRIPTION_CACHE_MAX_ENTRIES", "100000"))
+EVICTION_CHECK_EVERY = 200  # escritas entre verificações do tamanho
+# used_at só serve para escolher o que remover ao passar do limite: leituras só o atualizam
+# se ele tiver mais que isso, e em lote (até TOUCH_FLUSH_EVERY acessos por commit)
+USED_AT_RESOLUTION = 24 * 3600
+TOUCH_FLUSH_EVERY = 200
+
+
+def normalize_path(path: str) -> str:
+    """Remove barras duplicadas e a barra final"""
+    return "/" + "/".join(part for part in path.strip().split("/") if part)
+
+
+def description_key(tool_name: str, method: str, path: str, context: str, model: str) -> str:
+    """Chave estável: mesma tool, endpoint, contexto enviado ao LLM e modelo"""
+    context_hash = hashlib.sha256(" ".join(context.split()).encode("utf-8")).hexdigest()
+    raw = "\x1f".join([tool_name.strip().lower(), method.upper(), normalize_path(path), context_hash, model])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DescriptionCache:
+    """Descrições por chave, com expiração e remoção das menos usadas ao passar do limite"""
+
+    def __init__(self, path: str = DESCRIPTION_CACHE_PATH, ttl: float = DESCRIPTION_CACHE_TTL,
+                 max_entries: int = DESCRIPTION_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._touched: Dict[str, float] = {}  # used_at pendentes de gravação
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS descriptions (
+                key TEXT PRIMARY KEY,
+                description TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_descriptions_used_at ON descriptions (used_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT description, created_at, used_at FROM descriptions WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+
+            description, created_at, used_at = row
+            if self.ttl > 0 and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM descriptions WHERE key = ?", (key,))
+                self._conn.commit()
+                self._touched.pop(key, None)
+                return None
+
+            if now - used_at > USED_AT_RESOLUTION and key not in self._touched:
+                self._touched[key] = now
+                if len(self._touched) >= TOUCH_FLUSH_EVERY:
+                    self._flush_touched()
+                    self._conn.commit()
+            return description
+
+    def put(self, key: str, description: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO descriptions (key, description, created_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, description, now, now)
+            )
+            self._conn.commit()
+
+            self._writes += 1
+            if self._writes % EVICTION_CHECK_EVERY == 0:
+                self._evict(now)
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany("UPDATE descriptions SET used_at = ? WHERE key = ?",
+                                   [(used_at, key) for key, used_at in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self, now: float):
+        self._flush_touched()
+        if self.ttl > 0:
+            self._conn.execute("DELETE FROM descriptions WHERE created_at < ?", (now - self.ttl,))
+
+        count = self._conn.execute("SELECT COUNT(*) FROM descriptions").fetchone()[0]
+        if self.max_entries > 0 and count > self.max_entries:
+            # Remove um pouco além do excesso para não voltar a limpar a cada escrita
+            excess = count - int(self.max_entries * 0.9)
+            self._conn.execute("""
+                DELETE FROM descriptions WHERE key IN (
+                    SELECT key FROM descriptions ORDER BY used_at LIMIT ?
+                )
+            """, (excess,))
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+_description_cache: Optional[DescriptionCache] = None
+_description_cache_lock = threading.Lock()
+
+
+def get_description_cache() -> DescriptionCache:
+    """Instância única por processo, aberta sob demanda"""
+    global _description_cache
+    with _description_cache_lock:
+        if _description_cache is None:
+            _description_cache = DescriptionCache()
+        return _description_cache
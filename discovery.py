@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Descoberta incremental de servidores MCP gerados
+Mantém um índice persistido (diretório, mtime, hash do server.py) e só reexamina o que mudou
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+MCP_SERVERS_DIR = Path("./mcp_servers")
+MCP_SERVERS_PATTERN = "mcp_servers_*"
+INDEX_FILE = Path("./.mcp_discovery_index.json")
+IGNORED_DIRS = {"mcp_servers_20251114_012905"}
+INDEX_VERSION = 1
+
+SETTLE_SECONDS = 2.0  # server.py modificado há menos que isso pode estar incompleto
+WATCH_DEBOUNCE = 0.5
+WATCH_POLL_INTERVAL = 5.0
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _files_unchanged(servers: List[Dict]) -> bool:
+    """Indica se o server.py de cada servidor indexado mantém mtime e tamanho"""
+    for server in servers:
+        try:
+            st = os.stat(server["path"])
+        except OSError:
+            return False
+        if st.st_mtime_ns != server["mtime"] or st.st_size != server["size"]:
+            return False
+    return True
+
+
+class ServerDiscovery:
+    """Descobre servidores MCP reaproveitando o índice da última varredura"""
+
+    def __init__(self, base_dir: Path = Path("."), servers_dir: Path = MCP_SERVERS_DIR,
+                 index_file: Optional[Path] = INDEX_FILE):
+        self.base_dir = Path(base_dir)
+        self.servers_dir = Path(servers_dir)
+        self.index_file = Path(index_file) if index_file else None
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+        self._dirty = False
+
+    def _load_index(self) -> Dict:
+        empty = {"version": INDEX_VERSION, "roots": {}, "dirs": {}}
+        if not self.index_file or not self.index_file.exists():
+            return empty
+        try:
+            with open(self.index_file, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        if index.get("version") != INDEX_VERSION:
+            return empty
+        return index
+
+    def _save_index(self):
+        if not self.index_file or not self._dirty:
+            return
+        directory = self.index_file.parent
+        fd, tmp_path = tempfile.mkstemp(prefix=".mcp_discovery.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(json.dumps(self._index))
+            os.replace(tmp_path, self.index_file)
+            self._dirty = False
+        except OSError as e:
+            print(f"Erro ao salvar índice de descoberta: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def _timestamp_dirs(self, root: Path, pattern: str) -> List[str]:
+        """Lista os diretórios de geração de uma raiz, relendo-a só se o mtime mudou"""
+        key = str(root.absolute())
+        mtime = _mtime(root)
+        cached = self._index["roots"].get(key)
+
+        if mtime is None:
+            if cached is not None:
+                del self._index["roots"][key]
+                self._dirty = True
+            return []
+
+        if cached and cached["mtime"] == mtime:
+            return cached["dirs"]
+
+        dirs = sorted(
+            (str(p.absolute()) for p in root.glob(pattern)
+             if p.is_dir() and p.name not in IGNORED_DIRS),
+            reverse=True
+        )
+        # O próprio índice vive na raiz e altera seu mtime: só persiste se a lista mudou
+        if not cached or cached["dirs"] != dirs:
+            self._dirty = True
+        self._index["roots"][key] = {"mtime": mtime, "dirs": dirs}
+        return dirs
+
+    def _scan_timestamp_dir(self, timestamp_dir: str) -> List[Dict]:
+        """Servidores de um diretório de geração, reexaminando apenas o que mudou"""
+        entry = self._index["dirs"].get(timestamp_dir)
+        mtime = _mtime(Path(timestamp_dir))
+
+        if mtime is None:
+            return []
+
+        # Subdiretórios ainda sem server.py (gerador escrevendo) são rechecados sempre.
+        # Reescrever um server.py no lugar (ex.: mcp_fixer) não muda o mtime deste diretório:
+        # cada server.py conhecido ainda recebe um stat
+        if (entry and entry["mtime"] == mtime and not entry["incomplete"]
+                and _files_unchanged(entry["servers"])):
+            return entry["servers"]
+
+        previous = {s["directory"]: s for s in entry["servers"]} if entry else {}
+        subdirs = entry["subdirs"] if entry and entry["mtime"] == mtime else None
+        if subdirs is None:
+            subdirs = sorted(str(p.absolute()) for p in Path(timestamp_dir).iterdir() if p.is_dir())
+
+        servers = []
+        incomplete = []
+        timestamp = Path(timestamp_dir).name
+        now_ns = time.time_ns()
+
+        for server_dir in subdirs:
+            server_file = Path(server_dir) / "server.py"
+            try:
+                st = os.stat(server_file)
+            except OSError:
+                incomplete.append(server_dir)
+                continue
+
+            if now_ns - st.st_mtime_ns < SETTLE_SECONDS * 1e9:
+                incomplete.append(server_dir)
+
+            known = previous.get(server_dir)
+            if known and known["mtime"] == st.st_mtime_ns and known["size"] == st.st_size:
+                servers.append(known)
+                continue
+
+            servers.append({
+                "name": Path(server_dir).name,
+                "path": str(server_file),
+                "directory": server_dir,
+                "timestamp": timestamp,
+                "mtime": st.st_mtime_ns,
+                "size": st.st_size,
+                "hash": _file_hash(server_file)
+            })
+
+        self._index["dirs"][timestamp_dir] = {
+            "mtime": mtime,
+            "subdirs": subdirs,
+            "incomplete": incomplete,
+            "servers": servers
+        }
+        self._dirty = True
+        return servers
+
+    def invalidate(self, path: str):
+        """Descarta do índice o diretório de geração que contém o caminho"""
+        with self._lock:
+            for timestamp_dir in list(self._index["dirs"]):
+                if path.startswith(timestamp_dir + os.sep):
+                    del self._index["dirs"][timestamp_dir]
+                    self._dirty = True
+
+    def discover(self) -> List[Dict]:
+        """Descobre todos os servidores MCP gerados"""
+        with self._lock:
+            timestamp_dirs = self._timestamp_dirs(self.base_dir, MCP_SERVERS_PATTERN)
+            timestamp_dirs += self._timestamp_dirs(self.servers_dir, "*")
+
+            servers = []
+            for timestamp_dir in timestamp_dirs:
+                for server in self._scan_timestamp_dir(timestamp_dir):
+                    servers.append({
+                        "name": server["name"],
+                        "path": server["path"],
+                        "directory": server["directory"],
+                        "timestamp": server["timestamp"],
+                        "hash": server["hash"]
+                    })
+
+            live = set(timestamp_dirs)
+            for stale in [d for d in self._index["dirs"] if d not in live]:
+                del self._index["dirs"][stale]
+                self._dirty = True
+
+            self._save_index()
+            return servers
+
+
+class _ServerFileHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "DiscoveryWatcher"):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        paths = [p for p in (getattr(event, "src_path", ""), getattr(event, "dest_path", "")) if p]
+        if event.is_directory:
+            self.watcher.trigger()
+        elif any(os.path.basename(p) == "server.py" for p in paths):
+            self.watcher.trigger(paths)
+
+
+class DiscoveryWatcher:
+    """Registra servidores novos assim que o gerador termina de escrevê-los
+
+    Usa inotify (via watchdog) quando disponível; caso contrário, faz varreduras
+    incrementais periódicas, que custam poucos stats quando nada mudou.
+    """
+
+    def __init__(self, discovery: ServerDiscovery, callback: Callable[[List[Dict]], None],
+                 poll_interval: float = WATCH_POLL_INTERVAL, debounce: float = WATCH_DEBOUNCE):
+        self.discovery = discovery
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._event = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+        self._watched = set()
+        self._changed: List[str] = []  # preenchida pela thread do watchdog
+        self._changed_lock = threading.Lock()
+
+    def start(self):
+        if self._thread:
+            return
+        if Observer is not None:
+            self._observer = Observer()
+            self._observer.start()
+            self._watch_roots()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        mode = "inotify" if self._observer else f"polling a cada {self.poll_interval}s"
+        print(f"Observando novos servidores MCP ({mode})")
+
+    def stop(self):
+        self._stop.set()
+        self._event.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def trigger(self, paths: Optional[List[str]] = None):
+        if paths:
+            with self._changed_lock:
+                self._changed.extend(paths)
+        self._event.set()
+
+    def _watch(self, path: Path, recursive: bool):
+        key = str(path.absolute())
+        if key in self._watched or not path.is_dir():
+            return
+        self._observer.schedule(_ServerFileHandler(self), key, recursive=recursive)
+        self._watched.add(key)
+
+    def _watch_roots(self):
+        base = self.discovery.base_dir
+        self._watch(base, recursive=False)
+        for timestamp_dir in base.glob(MCP_SERVERS_PATTERN):
+            self._watch(timestamp_dir, recursive=True)
+        self._watch(self.discovery.servers_dir, recursive=True)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            timeout = None if self._observer else self.poll_interval
+            self._event.wait(timeout)
+            if self._stop.is_set():
+                break
+
+            # Agrupa rajadas de eventos (mkdir + escrita dos arquivos) em uma varredura
+            self._stop.wait(self.debounce)
+            self._event.clear()
+
+            with self._changed_lock:
+                changed, self._changed = self._changed, []
+            for path in changed:
+                self.discovery.invalidate(path)
+
+            try:
+                if self._observer:
+                    self._watch_roots()
+                self.callback(self.discovery.discover())
+            except Exception as e:
+                print(f"Erro na descoberta automática: {e}")
+
+
+discovery = ServerDiscovery()
+
+
+def discover_mcp_servers() -> List[Dict]:
+    """Descobre todos os servidores MCP gerados"""
+    return discovery.discover()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Índice de endpoints por template de path
+Trie sobre os segmentos do path em que segmentos de parâmetro ({owner}, {repo}...) são
+curingas: /repos/{owner}/{repo} e /repos/{owner}/{repository}/ viram o mesmo endpoint
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+PARAM_REGEX = re.compile(r'\{[^}]*\}')
+WILDCARD = "{}"
+MAX_MERGED_CONTEXT = 2000  # caracteres de contexto acumulados por endpoint
+
+
+def path_segments(path: str) -> List[str]:
+    """Segmentos não vazios (ignora barras duplicadas e a barra final)"""
+    return [segment for segment in path.strip().split('/') if segment]
+
+
+def segment_key(segment: str) -> str:
+    """Chave do segmento na trie: parâmetros viram curinga, mesmo dentro de segmentos mistos"""
+    return PARAM_REGEX.sub(WILDCARD, segment)
+
+
+@dataclass
+class IndexedEndpoint:
+    method: str
+    path: str  # template canônico: o primeiro visto, normalizado
+    source_url: str
+    contexts: List[str] = field(default_factory=list)
+    aliases: List[str] = field(default_factory=list)  # outras grafias do mesmo template
+    frozen: bool = False  # já entregue adiante: não acumula mais contexto
+
+    @property
+    def context(self) -> str:
+        return " ... ".join(self.contexts)
+
+    def merge_context(self, context: str):
+        if self.frozen or not context or context in self.contexts:
+            return
+        if len(self.context) + len(context) > MAX_MERGED_CONTEXT:
+            return
+        self.contexts.append(context)
+
+
+class _Node:
+    __slots__ = ("children", "endpoints")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.endpoints: Dict[str, IndexedEndpoint] = {}
+
+
+class EndpointIndex:
+    """Endpoints únicos por (método, template); duplicatas fundem seus contextos"""
+
+    def __init__(self):
+        self._root = _Node()
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _node(self, path: str, create: bool) -> Optional[_Node]:
+        node = self._root
+        for segment in path_segments(path):
+            key = segment_key(segment)
+            child = node.children.get(key)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[key] = _Node()
+            node = child
+        return node
+
+    def find(self, method: str, path: str) -> Optional[IndexedEndpoint]:
+        node = self._node(path, create=False)
+        return node.endpoints.get(method.upper()) if node else None
+
+    def add(self, method: str, path: str, context: str, source_url: str) -> Tuple[IndexedEndpoint, bool]:
+        """Indexa o endpoint; retorna (entrada canônica, se é nova)"""
+        method = method.upper()
+        node = self._node(path, create=True)
+        entry = node.endpoints.get(method)
+
+        if entry is None:
+            entry = IndexedEndpoint(method, "/" + "/".join(path_segments(path)), source_url)
+            entry.merge_context(context)
+            node.endpoints[method] = entry
+            self._count += 1
+            return entry, True
+
+        normalized = "/" + "/".join(path_segments(path))
+        if normalized != entry.path and normalized not in entry.aliases:
+            entry.aliases.append(normalized)
+        entry.merge_context(context)
+        return entry, False
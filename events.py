@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Eventos de status e progresso das extrações
+Barramento em memória para os assinantes deste processo (streams SSE) e repasse, via
+LISTEN/NOTIFY do Postgres, dos eventos publicados por workers em outros processos
+"""
+import json
+import os
+import queue
+import select
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+EVENT_ORIGIN = f"{socket.gethostname()}:{os.getpid()}"  # eventos do próprio processo chegam direto
+SUBSCRIBER_QUEUE_SIZE = 100  # assinante lento perde eventos antigos em vez de segurar o publicador
+LISTEN_RETRY = 30.0  # segundos entre tentativas de reabrir o LISTEN
+LISTEN_WAKEUP = 5.0
+
+
+class ExtractionEventBus:
+    """Assinaturas por extração; cada assinante recebe os eventos em uma fila própria"""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[queue.Queue]] = {}
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self.connected = False  # recebendo eventos de outros processos
+
+    def subscribe(self, extraction_id: int) -> queue.Queue:
+        subscription: queue.Queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(extraction_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, extraction_id: int, subscription: queue.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(extraction_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[extraction_id]
+
+    def publish(self, event: Dict[str, Any]):
+        """Entrega {'id', 'type', 'data'} aos assinantes da extração"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(event['id'], ()))
+        for subscription in subscribers:
+            while True:
+                try:
+                    subscription.put_nowait(event)
+                    break
+                except queue.Full:
+                    try:
+                        subscription.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def deliver_notification(self, payload: str):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            print(f"Invalid extraction event: {payload[:200]}")
+            return
+        if event.get('origin') != EVENT_ORIGIN:
+            self.publish(event)
+
+    def start_listener(self, listen: Callable[[], Any]):
+        """Passa a receber os eventos de outros processos; listen abre a conexão de LISTEN"""
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(target=self._listen_loop, args=(listen,),
+                                              name="extraction-events", daemon=True)
+        self._listener.start()
+
+    def _listen_loop(self, listen: Callable[[], Any]):
+        conn = None
+        while True:
+            if conn is None:
+                conn = listen()
+                self.connected = conn is not None
+                if conn is None:
+                    time.sleep(LISTEN_RETRY)
+                    continue
+            try:
+                ready, _, _ = select.select([conn], [], [], LISTEN_WAKEUP)
+                if not ready:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self.deliver_notification(conn.notifies.pop(0).payload)
+            except Exception as e:
+                print(f"Extraction events connection lost: {e}")
+                self.connected = False
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None
+
+
+extraction_events = ExtractionEventBus()
@@ -3,12 +3,10 @@
 MCP Gateway usando FastMCP
 Integra todos os servidores MCP gerados dinamicamente
 """
-import os
 import sys
 import json
-import subprocess
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 try:
     from fastmcp import FastMCP
     mcp = FastMCP("MCP Gateway")
@@ -16,115 +14,36 @@ except ImportError:
     print("⚠️  FastMCP não instalado. Use 'pip install fastmcp' ou use gateway_server.py")
     sys.exit(1)
 import asyncio
+from mcp_pool import MCPPoolManager
+from registry import MCPRegistry, REGISTRY_FILE
+from discovery import discover_mcp_servers
 
-MCP_SERVERS_DIR = Path("./mcp_servers")
-MCP_SERVERS_PATTERN = "mcp_servers_*"
-REGISTRY_FILE = Path("./mcp_registry.json")
-
-def discover_mcp_servers() -> List[Dict]:
-    """Descobre todos os servidores MCP gerados"""
-    servers = []
-    
-    base_dir = Path(".")
-    
-    for timestamp_dir in sorted(base_dir.glob(MCP_SERVERS_PATTERN), reverse=True):
-        if not timestamp_dir.is_dir() or timestamp_dir.name == "mcp_servers_20251114_012905":
-            continue
-        
-        for server_dir in timestamp_dir.iterdir():
-            if not server_dir.is_dir():
-                continue
-            
-            server_file = server_dir / "server.py"
-            if server_file.exists():
-                server_name = server_dir.name
-                server_path = str(server_file.absolute())
-                
-                servers.append({
-                    "name": server_name,
-                    "path": server_path,
-                    "directory": str(server_dir.absolute()),
-                    "timestamp": timestamp_dir.name
-                })
-    
-    if MCP_SERVERS_DIR.exists():
-        for timestamp_dir in sorted(MCP_SERVERS_DIR.iterdir(), reverse=True):
-            if not timestamp_dir.is_dir():
-                continue
-            
-            for server_dir in timestamp_dir.iterdir():
-                if not server_dir.is_dir():
-                    continue
-                
-                server_file = server_dir / "server.py"
-                if server_file.exists():
-                    server_name = server_dir.name
-                    server_path = str(server_file.absolute())
-                    
-                    servers.append({
-                        "name": server_name,
-                        "path": server_path,
-                        "directory": str(server_dir.absolute()),
-                        "timestamp": timestamp_dir.name
-                    })
-    
-    return servers
-
-def load_registry() -> Dict:
-    """Carrega o registro de servidores MCP"""
-    if REGISTRY_FILE.exists():
-        try:
-            with open(REGISTRY_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    return {"servers": []}
-
-def save_registry(registry: Dict):
-    """Salva o registro de servidores MCP"""
-    with open(REGISTRY_FILE, 'w') as f:
-        json.dump(registry, f, indent=2)
+pool_manager = MCPPoolManager()
+registry = MCPRegistry(REGISTRY_FILE)
 
 def register_mcp_server(server_info: Dict):
     """Registra um servidor MCP no gateway"""
-    registry = load_registry()
-    
-    existing = next(
-        (s for s in registry["servers"] if s["name"] == server_info["name"]),
-        None
-    )
-    
-    if existing:
-        existing.update(server_info)
-    else:
-        registry["servers"].append(server_info)
-    
-    save_registry(registry)
+    registry.register(server_info)
 
 def auto_discover_and_register():
     """Descobre e registra automaticamente todos os servidores MCP"""
     discovered = discover_mcp_servers()
-    registry = load_registry()
     
-    registered_names = {s["name"] for s in registry["servers"]}
+    for server in registry.register_many(discovered):
+        print(f"Registrado: {server['name']} ({server['path']})")
     
-    for server in discovered:
-        if server["name"] not in registered_names:
-            register_mcp_server(server)
-            print(f"Registrado: {server['name']} ({server['path']})")
-    
-    return load_registry()
+    return registry.servers()
 
 @mcp.tool()
 def list_mcp_servers() -> str:
     """Lista todos os servidores MCP registrados no gateway"""
-    registry = load_registry()
+    servers = registry.servers()
     
-    if not registry["servers"]:
+    if not servers:
         return "Nenhum servidor MCP registrado."
     
-    result = f"Servidores MCP registrados ({len(registry['servers'])}):\n\n"
-    for i, server in enumerate(registry["servers"], 1):
+    result = f"Servidores MCP registrados ({len(servers)}):\n\n"
+    for i, server in enumerate(servers, 1):
         result += f"{i}. {server['name']}\n"
         result += f"   Caminho: {server['path']}\n"
         result += f"   Timestamp: {server.get('timestamp', 'N/A')}\n\n"
@@ -134,9 +53,9 @@ def list_mcp_servers() -> str:
 @mcp.tool()
 def discover_new_servers() -> str:
     """Descobre e registra novos servidores MCP automaticamente"""
-    registry_before = len(load_registry()["servers"])
+    registry_before = len(registry)
     auto_discover_and_register()
-    registry_after = len(load_registry()["servers"])
+    registry_after = len(registry)
     
     new_count = registry_after - registry_before
     
@@ -148,12 +67,7 @@ def discover_new_servers() -> str:
 @mcp.tool()
 def get_server_info(server_name: str) -> str:
     """Obtém informações detalhadas de um servidor MCP específico"""
-    registry = load_registry()
-    
-    server = next(
-        (s for s in registry["servers"] if s["name"].lower() == server_name.lower()),
-        None
-    )
+    server = registry.get(server_name)
     
     if not server:
         return f"Servidor '{server_name}' não encontrado."
@@ -172,56 +86,22 @@ def get_server_info(server_name: str) -> str:
 
 async def proxy_to_server(server_name: str, tool_name: str, arguments: Dict) -> str:
     """Proxy para chamar uma tool de um servidor MCP específico"""
-    registry = load_registry()
-    
-    server = next(
-        (s for s in registry["servers"] if s["name"].lower() == server_name.lower()),
-        None
-    )
+    server = registry.get(server_name)
     
     if not server:
         return f"Erro: Servidor '{server_name}' não encontrado."
     
-    server_path = server['path']
-    
     try:
-        env = os.environ.copy()
-        
-        proc = await asyncio.create_subprocess_exec(
-            sys.executable,
-            server_path,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            env=env
-        )
-        
-        request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": arguments
-            }
-        }
-        
-        stdout, stderr = await proc.communicate(json.dumps(request).encode())
-        
-        if proc.returncode == 0:
-            response = json.loads(stdout.decode())
-            return json.dumps(response, indent=2)
-        else:
-            return f"Erro ao executar tool: {stderr.decode()}"
-    
+        response = await pool_manager.call_tool(server, tool_name, arguments)
+        return json.dumps(response, indent=2)
+    except asyncio.TimeoutError:
+        return "Erro: Timeout ao executar tool"
     except Exception as e:
         return f"Erro ao conectar com servidor: {str(e)}"
 
 def create_dynamic_tools():
     """Cria tools dinâmicas baseadas nos servidores MCP registrados"""
-    registry = load_registry()
-    
-    for server in registry["servers"]:
+    for server in registry.servers():
         server_name = server["name"]
         
         @mcp.tool(name=f"call_{server_name}")
@@ -242,8 +122,7 @@ if __name__ == "__main__":
     
     auto_discover_and_register()
     
-    registry = load_registry()
-    print(f"{len(registry['servers'])} servidor(es) MCP registrado(s)")
+    print(f"{len(registry)} servidor(es) MCP registrado(s)")
     
     create_dynamic_tools()
     
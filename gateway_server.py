@@ -3,17 +3,32 @@
 Servidor HTTP para o MCP Gateway
 Expõe os servidores MCP via API REST
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 from typing import List, Dict, Optional
-import json
-import subprocess
-import sys
-from pathlib import Path
+import asyncio
+import os
 import uvicorn
+from mcp_pool import MCPPoolManager, MCPProcessError, CALL_TIMEOUT
+from registry import MCPRegistry, REGISTRY_FILE
+from discovery import DiscoveryWatcher, discover_mcp_servers, discovery
 
-app = FastAPI(title="MCP Gateway API", version="1.0.0")
+pool_manager = MCPPoolManager()
+registry = MCPRegistry(REGISTRY_FILE)
+watcher = DiscoveryWatcher(discovery, registry.register_many)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await pool_manager.start(registry.servers())
+    if os.getenv("MCP_DISCOVERY_WATCH", "").lower() in ("1", "true", "yes"):
+        watcher.start()
+    yield
+    watcher.stop()
+    await pool_manager.close()
+
+app = FastAPI(title="MCP Gateway API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,10 +38,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-MCP_SERVERS_DIR = Path("./mcp_servers")
-MCP_SERVERS_PATTERN = "mcp_servers_*"
-REGISTRY_FILE = Path("./mcp_registry.json")
-
 class ServerInfo(BaseModel):
     name: str
     path: str
@@ -37,70 +48,9 @@ class ToolCall(BaseModel):
     server_name: str
     tool_name: str
     arguments: Dict
+    timeout: Optional[float] = None
 
-def discover_mcp_servers() -> List[Dict]:
-    """Descobre todos os servidores MCP gerados"""
-    servers = []
-    
-    base_dir = Path(".")
-    
-    for timestamp_dir in sorted(base_dir.glob(MCP_SERVERS_PATTERN), reverse=True):
-        if not timestamp_dir.is_dir() or timestamp_dir.name == "mcp_servers_20251114_012905":
-            continue
-        
-        for server_dir in timestamp_dir.iterdir():
-            if not server_dir.is_dir():
-                continue
-            
-            server_file = server_dir / "server.py"
-            if server_file.exists():
-                server_name = server_dir.name
-                server_path = str(server_file.absolute())
-                
-                servers.append({
-                    "name": server_name,
-                    "path": server_path,
-                    "directory": str(server_dir.absolute()),
-                    "timestamp": timestamp_dir.name
-                })
-    
-    if MCP_SERVERS_DIR.exists():
-        for timestamp_dir in sorted(MCP_SERVERS_DIR.iterdir(), reverse=True):
-            if not timestamp_dir.is_dir():
-                continue
-            
-            for server_dir in timestamp_dir.iterdir():
-                if not server_dir.is_dir():
-                    continue
-                
-                server_file = server_dir / "server.py"
-                if server_file.exists():
-                    server_name = server_dir.name
-                    server_path = str(server_file.absolute())
-                    
-                    servers.append({
-                        "name": server_name,
-                        "path": server_path,
-                        "directory": str(server_dir.absolute()),
-                        "timestamp": timestamp_dir.name
-                    })
-    
-    return servers
-
-def load_registry() -> Dict:
-    """Carrega o registro de servidores MCP"""
-    if REGISTRY_FILE.exists():
-        try:
-            with open(REGISTRY_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    return {"servers": []}
-
-def save_registry(registry: Dict):
-    """Salva o registro de servidores MCP"""
-    with open(REGISTRY_FILE, 'w') as f:
-        json.dump(registry, f, indent=2)
+DISCONNECT_POLL_INTERVAL = 0.5
 
 @app.get("/")
 async def root():
@@ -111,36 +61,25 @@ async def root():
         "endpoints": {
             "servers": "/api/servers",
             "discover": "/api/discover",
-            "call": "/api/call"
+            "call": "/api/call",
+            "pool": "/api/pool/stats"
         }
     }
 
 @app.get("/api/servers", response_model=List[ServerInfo])
 async def list_servers():
     """Lista todos os servidores MCP registrados"""
-    registry = load_registry()
-    return registry.get("servers", [])
+    return registry.servers()
 
 @app.post("/api/discover")
 async def discover_servers():
     """Descobre e registra novos servidores MCP"""
     discovered = discover_mcp_servers()
-    registry = load_registry()
-    
-    registered_names = {s["name"] for s in registry["servers"]}
-    new_servers = []
-    
-    for server in discovered:
-        if server["name"] not in registered_names:
-            registry["servers"].append(server)
-            new_servers.append(server)
-    
-    if new_servers:
-        save_registry(registry)
+    new_servers = registry.register_many(discovered)
     
     return {
         "discovered": len(discovered),
-        "registered": len(registry["servers"]),
+        "registered": len(registry),
         "new": len(new_servers),
         "new_servers": new_servers
     }
@@ -148,63 +87,56 @@ async def discover_servers():
 @app.get("/api/servers/{server_name}")
 async def get_server(server_name: str):
     """Obtém informações de um servidor específico"""
-    registry = load_registry()
-    
-    server = next(
-        (s for s in registry["servers"] if s["name"].lower() == server_name.lower()),
-        None
-    )
+    server = registry.get(server_name)
     
     if not server:
         raise HTTPException(status_code=404, detail=f"Servidor '{server_name}' não encontrado")
     
     return server
 
+async def run_until_disconnect(request: Request, coro):
+    """Executa a chamada, cancelando-a se o cliente HTTP desconectar"""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Cliente desconectado")
+    finally:
+        if not task.done():
+            task.cancel()
+
 @app.post("/api/call")
-async def call_tool(tool_call: ToolCall):
+async def call_tool(tool_call: ToolCall, request: Request):
     """Chama uma tool de um servidor MCP"""
-    registry = load_registry()
-    
-    server = next(
-        (s for s in registry["servers"] if s["name"].lower() == tool_call.server_name.lower()),
-        None
-    )
+    server = registry.get(tool_call.server_name)
     
     if not server:
         raise HTTPException(status_code=404, detail=f"Servidor '{tool_call.server_name}' não encontrado")
     
     try:
-        server_path = server['path']
-        
-        proc = subprocess.run(
-            [sys.executable, server_path],
-            input=json.dumps({
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "tools/call",
-                "params": {
-                    "name": tool_call.tool_name,
-                    "arguments": tool_call.arguments
-                }
-            }).encode(),
-            capture_output=True,
-            timeout=30
+        timeout = tool_call.timeout or CALL_TIMEOUT
+        return await run_until_disconnect(
+            request,
+            pool_manager.call_tool(server, tool_call.tool_name, tool_call.arguments, timeout=timeout)
         )
-        
-        if proc.returncode == 0:
-            response = json.loads(proc.stdout.decode())
-            return response
-        else:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Erro ao executar tool: {proc.stderr.decode()}"
-            )
-    
-    except subprocess.TimeoutExpired:
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
         raise HTTPException(status_code=504, detail="Timeout ao executar tool")
+    except MCPProcessError as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao executar tool: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro: {str(e)}")
 
+@app.get("/api/pool/stats")
+async def pool_stats():
+    """Estatísticas do pool de processos MCP (ocupados/ociosos/iniciados/falhas)"""
+    return pool_manager.stats()
+
 @app.get("/health")
 async def health():
     """Health check endpoint"""
@@ -213,12 +145,11 @@ async def health():
 if __name__ == "__main__":
     print("Iniciando MCP Gateway Server...")
     
-    registry = load_registry()
-    if not registry.get("servers"):
+    if not registry.servers():
         print("Descobrindo servidores MCP...")
         discovered = discover_mcp_servers()
         if discovered:
-            save_registry({"servers": discovered})
+            registry.register_many(discovered)
             print(f"{len(discovered)} servidor(es) MCP descoberto(s)")
     
     uvicorn.run(app, host="0.0.0.0", port=8000)
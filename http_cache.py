@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Cache HTTP em disco para páginas de documentação
+SQLite com corpos comprimidos, respeitando Cache-Control e revalidando com ETag/Last-Modified
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional, Tuple
+
+import requests
+
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "./.http_cache.sqlite3")
+
+MAX_AGE_REGEX = re.compile(r'(?:^|,)\s*max-age\s*=\s*"?(\d+)"?', re.IGNORECASE)
+
+
+@dataclass
+class CachedPage:
+    url: str
+    status: int
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    no_cache: bool
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return not self.no_cache and time.time() < self.expires_at
+
+
+def _parse_cache_control(headers: Mapping[str, str]) -> Tuple[bool, bool, Optional[float]]:
+    """Retorna (no_store, no_cache, expires_at) a partir dos headers da resposta"""
+    cache_control = (headers.get("cache-control") or "").lower()
+    no_store = "no-store" in cache_control
+    no_cache = "no-cache" in cache_control
+
+    match = MAX_AGE_REGEX.search(cache_control)
+    if match:
+        return no_store, no_cache, time.time() + int(match.group(1))
+
+    expires = headers.get("expires")
+    if expires:
+        try:
+            return no_store, no_cache, parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            pass
+
+    # Sem validade explícita: sempre revalida com requisição condicional
+    return no_store, no_cache, None
+
+
+class HTTPCache:
+    """Cache de páginas compartilhado entre jobs; contadores são por instância (por job)"""
+
+    def __init__(self, path: str = HTTP_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                no_cache INTEGER NOT NULL DEFAULT 0,
+                expires_at REAL NOT NULL DEFAULT 0,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, etag, last_modified, no_cache, expires_at, body FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if not row:
+            return None
+        status, etag, last_modified, no_cache, expires_at, body = row
+        return CachedPage(url, status, zlib.decompress(body), etag, last_modified, bool(no_cache), expires_at)
+
+    def conditional_headers(self, page: Optional[CachedPage]) -> Dict[str, str]:
+        headers = {}
+        if page:
+            if page.etag:
+                headers["If-None-Match"] = page.etag
+            if page.last_modified:
+                headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    def store(self, url: str, status: int, headers: Mapping[str, str], body: bytes):
+        no_store, no_cache, expires_at = _parse_cache_control(headers)
+        if no_store or status != 200:
+            return
+
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO pages
+                    (url, status, etag, last_modified, no_cache, expires_at, body, size, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (url, status, headers.get("etag"), headers.get("last-modified"), int(no_cache),
+                  expires_at or 0, zlib.compress(body, 6), len(body), time.time()))
+            self._conn.commit()
+
+    def refresh(self, url: str, headers: Mapping[str, str]):
+        """Atualiza a validade de uma entrada após um 304"""
+        _, no_cache, expires_at = _parse_cache_control(headers)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET no_cache = ?, expires_at = ?, fetched_at = ?, "
+                "etag = COALESCE(?, etag) WHERE url = ?",
+                (int(no_cache), expires_at or 0, time.time(), headers.get("etag"), url)
+            )
+            self._conn.commit()
+
+    def _resolve(self, url: str, page: Optional[CachedPage], status: int,
+                 headers: Mapping[str, str], body: bytes) -> Tuple[int, bytes]:
+        if status == 304 and page:
+            self.revalidated += 1
+            self.bytes_saved += len(page.body)
+            self.refresh(url, headers)
+            return page.status, page.body
+
+        self.misses += 1
+        self.store(url, status, headers, body)
+        return status, body
+
+    async def fetch_async(self, client, url: str, before_request=None) -> Tuple[int, bytes]:
+        """GET via httpx.AsyncClient passando pelo cache; retorna (status, corpo)
+
+        before_request (corrotina recebendo a URL) só é aguardada quando há acesso à rede.
+        """
+        page = self.get(url)
+        if page and page.fresh:
+            self.hits += 1
+            self.bytes_saved += len(page.body)
+            return page.status, page.body
+
+        if before_request:
+            await before_request(url)
+        response = await client.get(url, headers=self.conditional_headers(page))
+        return self._resolve(url, page, response.status_code, response.headers, response.content)
+
+    def fetch(self, url: str, timeout: float = 10) -> Tuple[int, bytes]:
+        """GET síncrono via requests passando pelo cache; retorna (status, corpo)"""
+        page = self.get(url)
+        if page and page.fresh:
+            self.hits += 1
+            self.bytes_saved += len(page.body)
+            return page.status, page.body
+
+        response = requests.get(url, headers=self.conditional_headers(page), timeout=timeout)
+        return self._resolve(url, page, response.status_code, response.headers, response.content)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Contadores do cache no job, para o resumo gravado junto com a extração"""
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "bytes_saved": self.bytes_saved,
+        }
+
+    def summary(self) -> str:
+        return (f"{self.hits} hits, {self.revalidated} revalidated (304), {self.misses} misses, "
+                f"{self.bytes_saved / 1024:.0f} KB saved")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -4,30 +4,115 @@ GitHub API Complete Extractor
 Extrai TODOS os endpoints (763+) e gera descrições em português
 """
 import requests
-from bs4 import BeautifulSoup
+import httpx
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+import asyncio
+import bisect
+import collections
+import itertools
+import random
 import re
 import json
+import keyword
 import os
 import time
-from typing import List, Dict, Set, Tuple
+import shutil
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from pathlib import Path
 from urllib.parse import urljoin, urlparse
+from crawler import AsyncCrawler, CRAWL_MAX_BYTES, CRAWL_MAX_DEPTH, CRAWL_MAX_PAGES
+from description_cache import DescriptionCache, description_key, get_description_cache
+from endpoint_index import EndpointIndex
+from http_cache import HTTPCache
+from openapi import OpenAPISpec, load_openapi_spec
+from parameter_dictionary import ParameterDictionary, get_parameter_dictionary
+from pipeline import Pipeline
+from progress import ProgressTracker
+from rate_limit import rate_limiter
 
 # ============================================================================
 # CONFIGURAÇÃO
 # ============================================================================
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY", "")
+PERPLEXITY_API_URL = os.getenv("PERPLEXITY_API_URL", "https://api.perplexity.ai/chat/completions")
 SONAR_MODEL = "llama-3.1-sonar-large-128k-online"
+# Endpoints descritos por requisição ao LLM (1 = uma requisição por endpoint)
+DESCRIPTION_BATCH_SIZE = int(os.getenv("DESCRIPTION_BATCH_SIZE", "20"))
+LLM_TIMEOUT = 20
+
+# Enriquecimento assíncrono: requisições simultâneas ao LLM, novas tentativas em 429/5xx
+# e prazo por job (s) após o qual os endpoints restantes recebem a descrição padrão
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", "4"))
+ENRICH_MAX_RETRIES = int(os.getenv("ENRICH_MAX_RETRIES", "3"))
+ENRICH_BACKOFF_BASE = 1.0
+ENRICH_BACKOFF_MAX = 30.0
+ENRICH_DEADLINE = float(os.getenv("ENRICH_DEADLINE", "900"))
 
 # Regex para endpoints
 ENDPOINT_REGEX = re.compile(
     r'\b(GET|POST|PUT|DELETE|PATCH)\s+(\/[a-zA-Z0-9\-_/]*(?:\{[a-zA-Z0-9_]+\})?[a-zA-Z0-9\-_/]*)\b'
 )
 
-# Delay entre requests
+# Delay entre requests ao LLM e rajada permitida (token bucket compartilhado entre jobs;
+# RATE_LIMIT_HOSTS sobrescreve)
 DELAY = 0.3
 MAX_WORKERS = 3
+rate_limiter.set_host_limit(urlparse(PERPLEXITY_API_URL).netloc, 1 / DELAY, MAX_WORKERS)
+
+# Parâmetros de path nos templates
+PATH_PARAM_REGEX = re.compile(r'\{([a-zA-Z0-9_]+)\}')
+
+# Páginas seguintes do crawl cujas duplicatas ainda fundem contexto em um endpoint antes de
+# ele seguir para o enriquecimento (0 = segue na hora; duplicatas posteriores são só descartadas)
+ENDPOINT_MERGE_WINDOW = int(os.getenv("ENDPOINT_MERGE_WINDOW", "25"))
+
+# Backends de parsing do BeautifulSoup, do mais rápido ao mais lento
+HTML_PARSER_BACKENDS = [("lxml", "lxml"), ("html.parser", None)]
+
+def select_html_parser() -> str:
+    """Escolhe o parser HTML na inicialização (HTML_PARSER força um backend específico)"""
+    forced = os.getenv("HTML_PARSER", "").strip()
+    if forced:
+        return forced
+    
+    for backend, module in HTML_PARSER_BACKENDS:
+        if module is None:
+            return backend
+        try:
+            __import__(module)
+            return backend
+        except ImportError:
+            continue
+    
+    return "html.parser"
+
+HTML_PARSER = select_html_parser()
+
+# Processos para o parse das páginas durante o crawl (0 = parse no próprio processo)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))
+
+_parse_executor: Optional[ProcessPoolExecutor] = None
+_parse_executor_lock = threading.Lock()
+
+def get_parse_executor() -> Optional[ProcessPoolExecutor]:
+    """Pool de processos de parse, criado sob demanda e compartilhado entre os jobs"""
+    global _parse_executor
+    if PARSE_WORKERS <= 0:
+        return None
+    
+    with _parse_executor_lock:
+        if _parse_executor is None:
+            # spawn: fork de um processo com threads (worker, uvicorn) pode travar
+            _parse_executor = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _parse_executor
 
 # ============================================================================
 # MODELOS
@@ -78,50 +163,40 @@ class Endpoint:
 class GitHubDocsNavigator:
     """Navega pela documentação do GitHub para encontrar TODAS as páginas"""
     
-    def __init__(self):
+    def __init__(self, max_depth: Optional[int] = CRAWL_MAX_DEPTH, max_pages: Optional[int] = CRAWL_MAX_PAGES,
+                 cache: Optional[HTTPCache] = None, max_bytes: Optional[int] = CRAWL_MAX_BYTES):
         self.visited: Set[str] = set()
+        self.cache = cache
         self.base_url = "https://docs.github.com"
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        # Endpoints de cada página, extraídos do mesmo download usado no crawl
+        self.page_endpoints: Dict[str, List[Tuple[str, str, str]]] = {}
     
-    def find_all_api_pages(self, start_url: str) -> List[str]:
-        """Encontra TODAS as páginas de referência da API explorando recursivamente"""
+    def find_all_api_pages(self, start_url: str,
+                           on_page: Optional[Callable[[int, str, List[Tuple[str, str, str]]], None]] = None) -> List[str]:
+        """Encontra TODAS as páginas de referência da API com um crawl em largura concorrente
+        
+        on_page recebe (posição no crawl, url, endpoints) de cada página assim que ela é
+        processada; sem ele, os endpoints ficam em page_endpoints.
+        """
         print("🔍 Navegando pela documentação do GitHub...")
         
-        all_pages = self._crawl_recursive(start_url)
+        on_page = on_page or self._store_page
+        crawler = AsyncCrawler(partial(parse_page, base_url=self.base_url),
+                               max_depth=self.max_depth, max_pages=self.max_pages, max_bytes=self.max_bytes,
+                               visited=self.visited, cache=self.cache, executor=get_parse_executor(),
+                               on_page=lambda index, url, endpoints: on_page(index, url, endpoints or []))
+        all_pages = crawler.crawl(start_url)
         
         print(f"\n✅ Total: {len(all_pages)} páginas de API encontradas")
         
         return all_pages
     
-    def _crawl_recursive(self, page_url: str) -> List[str]:
-        """Explora recursivamente todas as páginas vinculadas que parecem conter endpoints"""
-        if page_url in self.visited:
-            return []
-        
-        print(f"   Visitando: {page_url}")
-        self.visited.add(page_url)
-        pages = [page_url]
-        
-        try:
-            response = requests.get(page_url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                full_url = urljoin(self.base_url, href.split('#')[0])
-                
-                # Considera somente links dentro da documentação REST do GitHub
-                if (full_url.startswith(self.base_url + "/en/rest") and
-                    full_url not in self.visited):
-                    # Exclui páginas de referência se quiser evitar (opcional)
-                    if '/reference/' not in full_url:
-                        pages.extend(self._crawl_recursive(full_url))
-        
-        except Exception as e:
-            print(f"  ⚠️ Erro ao acessar {page_url}: {e}")
-        
-        return pages
-
-
+    def _store_page(self, index: int, page_url: str, endpoints: List[Tuple[str, str, str]]):
+        self.page_endpoints[page_url] = endpoints
+    
     def _crawl_section(self, section_url: str) -> List[str]:
         """Extrai todas as páginas de uma seção"""
         if section_url in self.visited:
@@ -132,7 +207,7 @@ class GitHubDocsNavigator:
         
         try:
             response = requests.get(section_url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(response.content, HTML_PARSER)
             
             # Procura links para sub-páginas de referência
             for link in soup.find_all('a', href=True):
@@ -159,69 +234,256 @@ class GitHubDocsNavigator:
 # EXTRATOR DE ENDPOINTS
 # ============================================================================
 
-def extract_endpoints_from_page(url: str) -> List[Tuple[str, str, str]]:
+def parse_page(page_url: str, content: bytes, base_url: str) -> Tuple[List[str], List[Tuple[str, str, str]]]:
+    """Faz o parse da página uma única vez e retorna (links a seguir, endpoints)
+    
+    Roda nos processos do pool de parse: precisa ficar no nível do módulo (picklable).
+    """
+    soup = BeautifulSoup(content, HTML_PARSER)
+    
+    try:
+        endpoints = extract_endpoints_from_soup(soup)
+    except Exception as e:
+        print(f"  ⚠️ Erro ao extrair endpoints de {page_url}: {e}")
+        endpoints = []
+    
+    return extract_doc_links(soup, base_url), endpoints
+
+def extract_doc_links(soup: BeautifulSoup, base_url: str) -> List[str]:
+    """Links de uma página que parecem levar a outras páginas com endpoints"""
+    links = []
+    
+    for link in soup.find_all('a', href=True):
+        href = link['href']
+        full_url = urljoin(base_url, href.split('#')[0])
+        
+        # Considera somente links dentro da documentação REST do GitHub
+        # Exclui páginas de referência se quiser evitar (opcional)
+        if full_url.startswith(base_url + "/en/rest") and '/reference/' not in full_url:
+            links.append(full_url)
+    
+    return links
+
+def extract_endpoints_from_page(url: str, cache: Optional[HTTPCache] = None) -> List[Tuple[str, str, str]]:
     """Extrai endpoints de uma página"""
     try:
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        if cache:
+            _, content = cache.fetch(url)
+            soup = BeautifulSoup(content, HTML_PARSER)
+        else:
+            response = requests.get(url, timeout=10)
+            soup = BeautifulSoup(response.text, HTML_PARSER)
+        return extract_endpoints_from_soup(soup)
+    
+    except Exception as e:
+        return []
+
+# Blocos onde endpoints costumam aparecer e tipos de texto considerados pelo get_text()
+ENDPOINT_BLOCK_TAGS = {'pre', 'code', 'table', 'div'}
+HTTP_METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'PATCH')
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+def _collect_page_text(soup: BeautifulSoup) -> Tuple[List[str], List[Tuple[int, int, bool]]]:
+    """Percorre a árvore uma única vez, visitando cada nó de texto uma vez
+    
+    Retorna os textos em ordem e, para cada bloco (em pré-ordem), seu intervalo
+    [início, fim) no texto concatenado e se ele está aninhado em outro bloco.
+    """
+    strings = []
+    pos = 0
+    blocks = []
+    open_blocks = []  # (índice em blocks, profundidade da pilha)
+    stack = [iter(soup.contents)]
+    
+    while stack:
+        node = next(stack[-1], None)
         
-        # Procura em blocos de código e tabelas
-        blocks = soup.find_all(['pre', 'code', 'table', 'div'])
+        if node is None:
+            stack.pop()
+            if open_blocks and open_blocks[-1][1] == len(stack):
+                index, _ = open_blocks.pop()
+                start, _, nested = blocks[index]
+                blocks[index] = (start, pos, nested)
+            continue
         
-        endpoints = []
-        seen = set()
+        if isinstance(node, Tag):
+            if node.name in ENDPOINT_BLOCK_TAGS:
+                blocks.append((pos, pos, bool(open_blocks)))
+                open_blocks.append((len(blocks) - 1, len(stack)))
+            stack.append(iter(node.contents))
+        elif type(node) in TEXT_STRING_TYPES:
+            strings.append(node)
+            pos += len(node)
+    
+    return strings, blocks
+
+def _may_split_endpoint(text: str, space: int) -> bool:
+    """Indica se o espaço na posição pode separar método e path de um match"""
+    return text.startswith('/', space + 1) and text.endswith(HTTP_METHODS, 0, space)
+
+def extract_endpoints_from_soup(soup: BeautifulSoup) -> List[Tuple[str, str, str]]:
+    """Extrai endpoints de uma página já baixada e parseada
+    
+    Equivale a normalizar o get_text() de cada bloco e rodar o ENDPOINT_REGEX nele,
+    mas sem reextrair o texto por ancestral: o texto da página é normalizado uma vez,
+    blocos externos são varridos uma vez e blocos aninhados só olham suas bordas,
+    único lugar onde podem achar algo que o bloco externo não achou.
+    """
+    strings, blocks = _collect_page_text(soup)
+    raw = ''.join(strings)
+    
+    # Texto normalizado da página inteira e mapa de posições brutas -> normalizadas
+    tokens = [m.span() for m in re.finditer(r'\S+', raw)]
+    raw_starts = [start for start, _ in tokens]
+    raw_ends = [end for _, end in tokens]
+    norm_starts = []
+    offset = 0
+    for start, end in tokens:
+        norm_starts.append(offset)
+        offset += end - start + 1
+    text = ' '.join(raw[start:end] for start, end in tokens)
+    
+    endpoints = []
+    seen = set()
+    
+    def add_match(match, base: int, block_start: int, block_end: int):
+        method = match.group(1)
+        path = match.group(2).rstrip('/')
         
-        for block in blocks:
-            text = ' '.join(block.get_text().split())
-            
-            for match in ENDPOINT_REGEX.finditer(text):
-                method = match.group(1)
-                path = match.group(2).rstrip('/')
-                
-                # Limpa path
-                path = re.sub(r'(GET|POST|PUT|DELETE|PATCH)$', '', path)
-                
-                key = (method, path)
-                if key in seen or len(path) < 3:
-                    continue
-                
-                seen.add(key)
-                
-                # Contexto
-                start = max(0, match.start() - 200)
-                end = min(len(text), match.end() + 200)
-                context = text[start:end]
-                
-                endpoints.append((method, path, context))
+        # Limpa path
+        path = re.sub(r'(GET|POST|PUT|DELETE|PATCH)$', '', path)
         
-        return endpoints
+        key = (method, path)
+        if key in seen or len(path) < 3:
+            return
+        
+        seen.add(key)
+        
+        # Contexto (limitado ao texto do bloco)
+        start = max(block_start, base + match.start() - 200)
+        end = min(block_end, base + match.end() + 200)
+        endpoints.append((method, path, text[start:end]))
     
-    except Exception as e:
-        return []
+    for raw_start, raw_end, nested in blocks:
+        first = bisect.bisect_right(raw_ends, raw_start)
+        last = bisect.bisect_left(raw_starts, raw_end) - 1
+        if first > last:
+            continue
+        
+        start = norm_starts[first] + max(0, raw_start - raw_starts[first])
+        end = norm_starts[last] + min(raw_ends[last], raw_end) - raw_starts[last]
+        
+        if not nested:
+            for match in ENDPOINT_REGEX.finditer(text[start:end]):
+                add_match(match, start, start, end)
+            continue
+        
+        # Longe das bordas o bloco aninhado acha exatamente os mesmos matches do bloco
+        # externo (já vistos). Só as bordas, até o primeiro espaço que com certeza não
+        # separa método e path, podem diferir e são varridas de novo.
+        head_end = text.find(' ', start, end)
+        while head_end != -1 and _may_split_endpoint(text, head_end):
+            head_end = text.find(' ', head_end + 1, end)
+        if head_end == -1:
+            head_end = end
+        
+        for match in ENDPOINT_REGEX.finditer(text[start:head_end]):
+            add_match(match, start, start, end)
+        
+        if head_end >= end:
+            continue
+        
+        tail_start = text.rfind(' ', head_end + 1, end)
+        while tail_start != -1 and _may_split_endpoint(text, tail_start):
+            tail_start = text.rfind(' ', head_end + 1, tail_start)
+        tail_start = head_end if tail_start == -1 else tail_start + 1
+        
+        for match in ENDPOINT_REGEX.finditer(text[tail_start:end]):
+            add_match(match, tail_start, start, end)
+    
+    return endpoints
 
 # ============================================================================
 # GERADOR DE DESCRIÇÕES EM PORTUGUÊS
 # ============================================================================
 
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After header in seconds (only the numeric form)"""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
 class DescriptionGenerator:
     """Generate endpoint descriptions in English using Perplexity"""
 
-    def __init__(self, api_key: str, tool_name: str):
+    def __init__(self, api_key: str, tool_name: str, cache: Optional[DescriptionCache] = None):
         self.api_key = api_key
         self.tool_name = tool_name
-        self.cache = {}  # Cache to avoid repeated requests
+        # Persistent cache shared by all jobs and runs to avoid repeated requests
+        self.cache = cache or get_description_cache()
 
     def generate_description(self, method: str, path: str, context: str) -> str:
         """Generate description in English"""
-
-        cache_key = f"{method}:{path}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        return self.generate_descriptions([(method, path, context)])[0]
+
+    def generate_descriptions(self, items: List[Tuple[str, str, str]]) -> List[str]:
+        """Generate descriptions for many (method, path, context) items
+
+        Uncached endpoints are packed DESCRIPTION_BATCH_SIZE per request; items missing
+        from (or malformed in) the answer get the fallback description.
+        """
+        keys, descriptions, chunks = self._plan(items)
+        for chunk in chunks:
+            chunk_items = [items[i] for i in chunk]
+            prompt, max_tokens = self._chunk_prompt(chunk_items)
+            results = self._parse_chunk(self._chat(prompt, max_tokens), len(chunk_items))
+            self._apply(chunk, results, keys, descriptions)
+        return self._with_fallback(items, descriptions)
+
+    async def generate_descriptions_async(self, items: List[Tuple[str, str, str]], client: httpx.AsyncClient,
+                                          deadline: Optional[float] = None) -> List[str]:
+        """Async generate_descriptions; requests not answered by the deadline (monotonic) use the fallback"""
+        keys, descriptions, chunks = self._plan(items)
+
+        async def request(chunk):
+            chunk_items = [items[i] for i in chunk]
+            prompt, max_tokens = self._chunk_prompt(chunk_items)
+            content = await self._chat_async(client, prompt, max_tokens, deadline)
+            self._apply(chunk, self._parse_chunk(content, len(chunk_items)), keys, descriptions)
+
+        await asyncio.gather(*(request(chunk) for chunk in chunks))
+        return self._with_fallback(items, descriptions)
+
+    def _plan(self, items: List[Tuple[str, str, str]]) -> Tuple[List[str], List[Optional[str]], List[List[int]]]:
+        """Cache keys, cached descriptions and the groups of uncached positions to request"""
+        keys = [description_key(self.tool_name, method, path, context[:300], SONAR_MODEL)
+                for method, path, context in items]
+        descriptions = [self.cache.get(key) for key in keys]
+        pending = [i for i, description in enumerate(descriptions) if description is None]
 
         if not self.api_key:
-            return self._fallback_description(method, path)
+            return keys, descriptions, []
+
+        batch_size = max(1, DESCRIPTION_BATCH_SIZE)
+        chunks = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        return keys, descriptions, chunks
 
-        prompt = f"""Analyze this API endpoint and generate a concise English description.
+    def _apply(self, chunk: List[int], results: Dict[int, str], keys: List[str], descriptions: List[Optional[str]]):
+        for position, i in enumerate(chunk):
+            if results.get(position):
+                descriptions[i] = results[position]
+                self.cache.put(keys[i], descriptions[i])
+
+    def _with_fallback(self, items: List[Tuple[str, str, str]], descriptions: List[Optional[str]]) -> List[str]:
+        return [description if description is not None else self._fallback_description(method, path)
+                for description, (method, path, _) in zip(descriptions, items)]
+
+    def _chunk_prompt(self, items: List[Tuple[str, str, str]]) -> Tuple[str, int]:
+        """Prompt and max_tokens for one request: single-endpoint prompt or batch prompt"""
+        if len(items) == 1:
+            method, path, context = items[0]
+            prompt = f"""Analyze this API endpoint and generate a concise English description.
 
 METHOD: {method}
 PATH: {path}
@@ -240,36 +502,135 @@ Examples:
 - DELETE /orgs/{{org}}/members/{{username}}: "Delete a member from an organization in {self.tool_name}"
 
 Return ONLY the description, without quotes or formatting."""
+            return prompt, 100
+
+        listing = "\n".join(
+            f"{i}. METHOD: {method} | PATH: {path} | CONTEXT: {' '.join(context[:300].split())}"
+            for i, (method, path, context) in enumerate(items, 1)
+        )
+        prompt = f"""Analyze these API endpoints and generate a concise English description for each one.
+
+{listing}
+
+Rules:
+1. Use English
+2. Be specific about what each endpoint does
+3. Mention the tool name '{self.tool_name}' at the beginning
+4. Use action verbs: "Get", "List", "Create", "Update", "Delete"
+5. Maximum 80 characters per description
+
+Return ONLY a JSON array with one object per endpoint, using the endpoint number as id:
+[{{"id": 1, "description": "Get detailed information of a user in {self.tool_name}"}}]"""
+        return prompt, 40 + 60 * len(items)
+
+    def _parse_chunk(self, content: Optional[str], count: int) -> Dict[int, str]:
+        """Map positions (0..count-1) to descriptions, skipping malformed items"""
+        if not content:
+            return {}
 
+        if count == 1:
+            description = content.strip().strip('"\'')
+            return {0: description} if description else {}
+
+        match = re.search(r'\[.*\]', content, re.DOTALL)
+        if not match:
+            return {}
         try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return {}
+
+        results = {}
+        for item in data if isinstance(data, list) else []:
+            if not isinstance(item, dict):
+                continue
+            index = item.get("id")
+            description = item.get("description")
+            if type(index) is not int or not 1 <= index <= count or not isinstance(description, str):
+                continue
+            description = description.strip().strip('"\'')
+            if description and index - 1 not in results:
+                results[index - 1] = description
+        return results
+
+    def _chat_payload(self, prompt: str, max_tokens: int) -> Dict:
+        return {
+            "model": SONAR_MODEL,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.2,
+            "max_tokens": max_tokens
+        }
+
+    def _chat(self, prompt: str, max_tokens: int) -> Optional[str]:
+        """Chat completion request; returns the answer text or None on failure"""
+        try:
+            rate_limiter.acquire(PERPLEXITY_API_URL)
             response = requests.post(
-                "https://api.perplexity.ai/chat/completions",
+                PERPLEXITY_API_URL,
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json"
                 },
-                json={
-                    "model": SONAR_MODEL,
-                    "messages": [
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": 0.2,
-                    "max_tokens": 100
-                },
-                timeout=20
+                json=self._chat_payload(prompt, max_tokens),
+                timeout=LLM_TIMEOUT
             )
 
             if response.ok:
                 result = response.json()
-                description = result["choices"][0]["message"]["content"].strip()
-                description = description.strip('"\'')
-                self.cache[cache_key] = description
-                return description
+                return result["choices"][0]["message"]["content"]
 
         except:
             pass
 
-        return self._fallback_description(method, path)
+        return None
+
+    async def _chat_async(self, client: httpx.AsyncClient, prompt: str, max_tokens: int,
+                          deadline: Optional[float] = None) -> Optional[str]:
+        """Async chat completion retried with jittered exponential backoff on 429/5xx and
+        network errors; gives up (None) when the deadline would be exceeded"""
+        for attempt in range(ENRICH_MAX_RETRIES + 1):
+            timeout = LLM_TIMEOUT
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    return None
+
+            retry_after = None
+            try:
+                await rate_limiter.acquire_async(PERPLEXITY_API_URL)
+                response = await asyncio.wait_for(client.post(
+                    PERPLEXITY_API_URL,
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json=self._chat_payload(prompt, max_tokens)
+                ), timeout)
+
+                if response.is_success:
+                    return response.json()["choices"][0]["message"]["content"]
+                if response.status_code != 429 and response.status_code < 500:
+                    return None
+                retry_after = _retry_after_seconds(response.headers.get("retry-after"))
+
+            except (httpx.TransportError, asyncio.TimeoutError):
+                pass
+            except (ValueError, KeyError, IndexError, TypeError):
+                return None
+
+            if attempt == ENRICH_MAX_RETRIES:
+                break
+
+            delay = retry_after
+            if delay is None:
+                delay = min(ENRICH_BACKOFF_MAX, ENRICH_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                return None
+            await asyncio.sleep(delay)
+
+        return None
 
     def _fallback_description(self, method: str, path: str) -> str:
         """Fallback description in English"""
@@ -303,60 +664,62 @@ Return ONLY the description, without quotes or formatting."""
 class EndpointEnricher:
     """Enrich endpoints with parameters and descriptions using Perplexity"""
 
-    def __init__(self, api_key: str, tool_name: str):
+    def __init__(self, api_key: str, tool_name: str, parameters: Optional[ParameterDictionary] = None):
         self.api_key = api_key
         self.desc_generator = DescriptionGenerator(api_key, tool_name)
+        # Parameter vocabulary (parameters.json), compiled once
+        self.parameters = parameters or get_parameter_dictionary()
 
     def enrich(self, method: str, path: str, context: str, source_url: str) -> Endpoint:
         description = self.desc_generator.generate_description(method, path, context)
         parameters = self._extract_parameters(path, context)
         return Endpoint(method=method, path=path, description=description, parameters=parameters, source_url=source_url)
 
+    def enrich_batch(self, items: List[Tuple[str, str, str, str]]) -> List[Endpoint]:
+        """Enrich several (method, path, context, source_url) items with batched LLM requests"""
+        descriptions = self.desc_generator.generate_descriptions(
+            [(method, path, context) for method, path, context, _ in items]
+        )
+        return self._build_endpoints(items, descriptions)
+
+    async def enrich_batch_async(self, items: List[Tuple[str, str, str, str]], client: httpx.AsyncClient,
+                                 deadline: Optional[float] = None) -> List[Endpoint]:
+        descriptions = await self.desc_generator.generate_descriptions_async(
+            [(method, path, context) for method, path, context, _ in items], client, deadline
+        )
+        return self._build_endpoints(items, descriptions)
+
+    def _build_endpoints(self, items: List[Tuple[str, str, str, str]], descriptions: List[str]) -> List[Endpoint]:
+        return [
+            Endpoint(method=method, path=path, description=description,
+                     parameters=self._extract_parameters(path, context), source_url=source_url)
+            for (method, path, context, source_url), description in zip(items, descriptions)
+        ]
+
     def _extract_parameters(self, path: str, context: str) -> List[Parameter]:
         """Extract parameters from path and context"""
         params = []
         seen = set()
 
         # Path parameters
-        for match in re.finditer(r'\{([a-zA-Z0-9_]+)\}', path):
+        for match in PATH_PARAM_REGEX.finditer(path):
             param_name = match.group(1)
 
             if param_name not in seen:
                 seen.add(param_name)
-
-                desc_map = {
-                    'username': 'GitHub username',
-                    'org': 'Organization name',
-                    'owner': 'Repository owner',
-                    'repo': 'Repository name',
-                    'id': 'Unique identifier',
-                    'number': 'Item number',
-                    'name': 'Resource name'
-                }
-
-                description = desc_map.get(param_name, f'The {param_name}')
-
                 params.append(Parameter(
                     name=param_name,
                     location="path",
                     type="string",
                     required=True,
-                    description=description
+                    description=self.parameters.path_description(param_name)
                 ))
 
-        # Common query parameters
-        common_query_params = {
-            'page': ('integer', 'Page number for pagination'),
-            'per_page': ('integer', 'Items per page (max 100)'),
-            'since': ('string', 'Filter results after this date'),
-            'state': ('string', 'Resource state (open, closed, all)'),
-            'sort': ('string', 'Field to sort by'),
-            'direction': ('string', 'Sort direction (asc, desc)')
-        }
-
-        for param_name, (param_type, param_desc) in common_query_params.items():
-            if param_name.lower() in context.lower() and param_name not in seen:
+        # Known query parameters, all matched in a single pass over the context
+        for param_name in self.parameters.find_query_parameters(context):
+            if param_name not in seen:
                 seen.add(param_name)
+                param_type, param_desc = self.parameters.query_parameters[param_name]
                 params.append(Parameter(
                     name=param_name,
                     location="query",
@@ -368,6 +731,108 @@ class EndpointEnricher:
         return params
 
 
+class AsyncEnrichmentEngine:
+    """Enrich endpoints concurrently with a bounded number of in-flight LLM requests
+
+    Batches are enriched in parallel (at most `concurrency` at a time) but emitted in
+    input order. After the per-job deadline, pending endpoints get the fallback description.
+    """
+
+    def __init__(self, enricher: EndpointEnricher, concurrency: int = ENRICH_CONCURRENCY,
+                 deadline: float = ENRICH_DEADLINE, batch_size: int = DESCRIPTION_BATCH_SIZE):
+        self.enricher = enricher
+        self.concurrency = max(1, concurrency)
+        self.deadline = deadline
+        self.batch_size = max(1, batch_size)
+
+    def run(self, items: Iterable[Tuple[str, str, str, str]], emit: Callable[[Endpoint], None]):
+        """Consume (method, path, context, source_url) items, possibly a blocking stream"""
+        asyncio.run(self._run(iter(items), emit))
+
+    async def _run(self, items: Iterator[Tuple[str, str, str, str]], emit: Callable[[Endpoint], None]):
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + self.deadline if self.deadline > 0 else None
+        semaphore = asyncio.Semaphore(self.concurrency)
+        window = collections.deque()  # batches in input order
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(timeout=LLM_TIMEOUT, limits=limits) as client:
+            async def enrich(batch):
+                async with semaphore:
+                    return await self.enricher.enrich_batch_async(batch, client, deadline)
+
+            async def flush(wait_all: bool):
+                # Emits finished batches from the head; waits when the window is full
+                while window and (wait_all or window[0].done() or len(window) >= 2 * self.concurrency):
+                    for endpoint in await window.popleft():
+                        await loop.run_in_executor(None, emit, endpoint)
+
+            while True:
+                # The input may block (pipeline queue): read it outside the event loop
+                batch = await loop.run_in_executor(None, lambda: list(itertools.islice(items, self.batch_size)))
+                if not batch:
+                    break
+                window.append(asyncio.create_task(enrich(batch)))
+                await flush(wait_all=False)
+
+            await flush(wait_all=True)
+
+
+# ============================================================================
+# ESPECIFICAÇÃO OPENAPI
+# ============================================================================
+
+def _clean_spec_text(text: str, limit: int = 300) -> str:
+    """Texto da especificação em uma linha, seguro para as docstrings geradas"""
+    text = ' '.join(str(text).split()).replace('\\', '/').replace('"', "'")
+    return text[:limit]
+
+def endpoints_from_openapi(spec: OpenAPISpec, tool_name: str) -> List[Endpoint]:
+    """Monta os endpoints direto das operações da especificação, sem crawl nem LLM"""
+    fallback = DescriptionGenerator("", tool_name)
+    endpoints = []
+    seen = set()
+    
+    for operation in spec.operations():
+        key = (operation.method, operation.path)
+        if key in seen:
+            continue
+        seen.add(key)
+        
+        summary = operation.summary or operation.description.split('\n\n')[0]
+        description = (_clean_spec_text(summary)
+                       or fallback._fallback_description(operation.method, operation.path))
+        
+        parameters = []
+        for param in operation.parameters:
+            location = param.get('in')
+            if location not in ('path', 'query'):
+                continue
+            
+            # OpenAPI 3 usa schema.type; Swagger 2 usa type; OpenAPI 3.1 aceita lista de tipos
+            param_type = (param.get('schema') or {}).get('type') or param.get('type') or 'string'
+            if isinstance(param_type, list):
+                param_type = next((t for t in param_type if t != 'null'), 'string')
+            
+            parameters.append(Parameter(
+                name=param['name'],
+                location=location,
+                type=str(param_type),
+                required=location == 'path' or bool(param.get('required')),
+                description=_clean_spec_text(param.get('description', '')) or f"The {param['name']}"
+            ))
+        
+        endpoints.append(Endpoint(
+            method=operation.method,
+            path=operation.path,
+            description=description,
+            parameters=parameters,
+            source_url=spec.url
+        ))
+    
+    return endpoints
+
+
 # ============================================================================
 # GERADOR DE MCP
 # ============================================================================
@@ -375,33 +840,48 @@ class EndpointEnricher:
 class MCPGenerator:
     """Gera MCP Server"""
     
+    # Nomes usados dentro de cada tool gerada: um parâmetro com esse nome os sobrescreveria
+    PLACEHOLDER_REGEX = re.compile(r'\{([^}]+)\}')  # qualquer {nome} do path, inclusive {item-id}
+    RESERVED_NAMES = ("url", "headers", "params", "client", "response", "httpx", "mcp", "get_headers", "Optional")
+    
     def __init__(self, api_name: str, base_url: str):
         self.api_name = api_name
         self.base_url = base_url
         self.function_names: Set[str] = set()
+        self.tool_count = 0
     
-    def generate(self, endpoints: List[Endpoint], output_dir: str = "./mcp_servers") -> Path:
-        """Gera servidor MCP"""
+    def generate(self, endpoints: Iterable[Endpoint], output_dir: str = "./mcp_servers") -> Path:
+        """Gera servidor MCP
+        
+        endpoints pode ser um stream: cada tool é escrita assim que seu endpoint chega e o
+        cabeçalho, que traz o total de tools, é montado no final.
+        """
         
         name_clean = re.sub(r'[^a-z0-9_]', '_', self.api_name.lower())
         server_dir = Path(output_dir) / name_clean
         server_dir.mkdir(parents=True, exist_ok=True)
         
-        print(f"\n🔧 Gerando MCP com {len(endpoints)} tools...")
+        print(f"\n🔧 Gerando MCP...")
         
         # Gera tools
-        tools = []
-        for endpoint in endpoints:
-            tool_code = self._generate_tool(endpoint)
-            if tool_code:
-                tools.append(tool_code)
-        
-        # Servidor
-        server_code = f'''#!/usr/bin/env python3
+        tools_file = server_dir / "server.py.tools"
+        endpoint_count = 0
+        tools = 0
+        try:
+            with open(tools_file, 'w', encoding='utf-8') as f:
+                for endpoint in endpoints:
+                    endpoint_count += 1
+                    tool_code = self._generate_tool(endpoint)
+                    if tool_code:
+                        f.write(("\n" if tools else "") + tool_code)
+                        tools += 1
+            
+            # Servidor
+            header = f'''#!/usr/bin/env python3
 """
 MCP Server para API do GitHub
 Gerado automaticamente em: {time.strftime("%Y-%m-%d %H:%M:%S")}
-Total de tools: {len(tools)}
+Total de tools: {tools}
 """
 import os
 import httpx
@@ -424,7 +904,8 @@ def get_headers():
     }}
 
 
-{chr(10).join(tools)}
+'''
+            footer = '''
 
 
 async def main():
@@ -436,14 +917,22 @@ if __name__ == "__main__":
     import asyncio
     asyncio.run(main())
 '''
+            
+            with open(server_dir / "server.py", 'w', encoding='utf-8') as out:
+                out.write(header)
+                with open(tools_file, 'r', encoding='utf-8') as tools_code:
+                    shutil.copyfileobj(tools_code, out)
+                out.write(footer)
+        finally:
+            tools_file.unlink(missing_ok=True)
         
-        (server_dir / "server.py").write_text(server_code, encoding='utf-8')
+        self.tool_count = tools
         (server_dir / "requirements.txt").write_text("httpx>=0.24.0\nmcp>=0.1.0\n")
         
         # README em português
         (server_dir / "README.md").write_text(f"""# Servidor MCP para GitHub API
 
-Servidor MCP gerado automaticamente com **{len(tools)} tools** da API do GitHub.
+Servidor MCP gerado automaticamente com **{tools} tools** da API do GitHub.
 
 ## Instalação
 
@@ -483,11 +972,11 @@ Adicione ao `claude_desktop_config.json`:
 
 ## Endpoints
 
-Total: {len(endpoints)} endpoints da API do GitHub
+Total: {endpoint_count} endpoints da API do GitHub
 """, encoding='utf-8')
         
         print(f"✅ MCP gerado: {server_dir}/")
-        print(f"   Tools: {len(tools)}")
+        print(f"   Tools: {tools}")
         
         return server_dir
     
@@ -507,31 +996,55 @@ Total: {len(endpoints)} endpoints da API do GitHub
         path_params = [p for p in endpoint.parameters if p.location == "path"]
         query_params = [p for p in endpoint.parameters if p.location == "query"]
         
+        # Placeholders do path sem parâmetro declarado (especificações incompletas) viram parâmetros
+        declared = {p.name for p in path_params}
+        for placeholder in self.PLACEHOLDER_REGEX.findall(endpoint.path):
+            if placeholder not in declared:
+                declared.add(placeholder)
+                path_params.append(Parameter(placeholder, "path", "string", True, f"The {placeholder}"))
+        
+        # Nome Python de cada parâmetro: sanitizado e único (ex.: 'id' no path e na query)
+        arg_names: Dict[Tuple[str, str], str] = {}
+        used = set(self.RESERVED_NAMES)
+        for p in path_params + query_params:
+            base = self._sanitize_name(p.name)
+            pname = base if base not in used else f"{base}_{p.location}"
+            counter = 2
+            while pname in used:
+                pname = f"{base}_{p.location}_{counter}"
+                counter += 1
+            used.add(pname)
+            arg_names[(p.location, p.name)] = pname
+        
         sig_parts = []
         for p in path_params:
-            pname = self._sanitize_name(p.name)
-            sig_parts.append(f"{pname}: str")
+            sig_parts.append(f"{arg_names[('path', p.name)]}: str")
         
         for p in query_params:
-            pname = self._sanitize_name(p.name)
-            sig_parts.append(f"{pname}: Optional[str] = None")
+            sig_parts.append(f"{arg_names[('query', p.name)]}: Optional[str] = None")
         
         signature = ", ".join(sig_parts) if sig_parts else ""
         
         # Docstring
         doc_lines = [f'"""{endpoint.description}']
-        if endpoint.parameters:
+        if path_params or query_params:
             doc_lines.append("    ")
             doc_lines.append("    Args:")
-            for p in endpoint.parameters:
-                pname = self._sanitize_name(p.name)
-                doc_lines.append(f"        {pname}: {p.description}")
+            for p in path_params + query_params:
+                doc_lines.append(f"        {arg_names[(p.location, p.name)]}: {p.description}")
         doc_lines.append('    """')
         
-        # Corpo
-        url_template = f'"{self.base_url}{endpoint.path}"'
+        # Corpo: cada {placeholder} do path vira o argumento correspondente; o resto é literal
+        url_template = f'"{self._escape_literal(self.base_url + endpoint.path, fstring=False)}"'
         if path_params:
-            url_template = f'f"{self.base_url}{endpoint.path}"'
+            parts = []
+            position = 0
+            for match in self.PLACEHOLDER_REGEX.finditer(endpoint.path):
+                parts.append(self._escape_literal(endpoint.path[position:match.start()], fstring=True))
+                parts.append("{" + arg_names[("path", match.group(1))] + "}")
+                position = match.end()
+            parts.append(self._escape_literal(endpoint.path[position:], fstring=True))
+            url_template = f'f"{self._escape_literal(self.base_url, fstring=True)}{"".join(parts)}"'
         
         lines = [
             "@mcp.call_tool()",
@@ -544,9 +1057,9 @@ Total: {len(endpoints)} endpoints da API do GitHub
         if query_params:
             lines.append("    params = {}")
             for p in query_params:
-                pname = self._sanitize_name(p.name)
+                pname = arg_names[('query', p.name)]
                 lines.append(f"    if {pname} is not None:")
-                lines.append(f"        params['{p.name}'] = {pname}")
+                lines.append(f"        params[{p.name!r}] = {pname}")
         
         method = endpoint.method.lower()
         lines.append("    async with httpx.AsyncClient() as client:")
@@ -567,9 +1080,17 @@ Total: {len(endpoints)} endpoints da API do GitHub
         name = re.sub(r'_+', '_', name).strip('_')
         if not name or name[0].isdigit():
             name = f"param_{name}"
-        if name in ['class', 'def', 'return', 'type']:
+        if keyword.iskeyword(name) or name == 'type':
             name = f"{name}_param"
         return name or "param"
+    
+    @staticmethod
+    def _escape_literal(text: str, fstring: bool) -> str:
+        """Texto seguro dentro de uma string entre aspas duplas (e de uma f-string)"""
+        text = text.replace('\\', '\\\\').replace('"', '\\"')
+        if fstring:
+            text = text.replace('{', '{{').replace('}', '}}')
+        return text
 
 # ============================================================================
 # PIPELINE COMPLETO
@@ -578,8 +1099,90 @@ Total: {len(endpoints)} endpoints da API do GitHub
 
 from datetime import datetime
 
+def extract_endpoints_from_docs(start_url: str, tool_name: str, http_cache: HTTPCache,
+                                pipeline: Pipeline, max_pages: Optional[int] = CRAWL_MAX_PAGES,
+                                max_bytes: Optional[int] = CRAWL_MAX_BYTES,
+                                progress: Optional[ProgressTracker] = None) -> Iterator[Endpoint]:
+    """Navega pela documentação HTML, extrai e enriquece os endpoints em estágios sobrepostos
+    
+    Cada página é deduplicada assim que chega do crawl e cada endpoint novo segue direto
+    para o enriquecimento; o iterador retornado entrega os endpoints prontos.
+    """
+    # 1. Navega e encontra TODAS as páginas (reaproveitando o cache HTTP de jobs anteriores)
+    def crawl(emit):
+        def on_page(index, url, endpoints):
+            progress.page_fetched()
+            emit((index, url, endpoints))
+        
+        navigator = GitHubDocsNavigator(max_pages=max_pages, cache=http_cache, max_bytes=max_bytes)
+        navigator.find_all_api_pages(start_url, on_page=on_page)
+        progress.set_stage("enriching")
+    
+    # 2. Extrai endpoints e funde duplicatas pelo template do path
+    def deduplicate(pages, emit):
+        # Páginas terminam fora de ordem: são liberadas na ordem do crawl (resultado determinístico)
+        waiting = {}
+        next_index = 0
+        index = EndpointIndex()
+        held = collections.deque()  # (página em que é liberado, endpoint)
+        
+        def release(entry):
+            entry.frozen = True
+            emit((entry.method, entry.path, entry.context, entry.source_url))
+        
+        for page_index, page_url, endpoints in pages:
+            waiting[page_index] = (page_url, endpoints)
+            while next_index in waiting:
+                page_url, endpoints = waiting.pop(next_index)
+                for method, path, context in endpoints:
+                    entry, created = index.add(method, path, context, page_url)
+                    if created:
+                        progress.endpoint_found()
+                        held.append((next_index + ENDPOINT_MERGE_WINDOW, entry))
+                
+                # Cada endpoint acumula o contexto das duplicatas das próximas páginas antes de seguir
+                while held and held[0][0] <= next_index:
+                    release(held.popleft()[1])
+                next_index += 1
+        
+        while held:
+            release(held.popleft()[1])
+        progress.endpoints_complete()
+        
+        print(f"\n✅ {len(index)} unique endpoints found in {next_index} pages")
+    
+    # 3. Enriquece com descrições
+    def enrich(unique_endpoints, emit):
+        enricher = EndpointEnricher(PERPLEXITY_API_KEY, tool_name)
+        count = 0
+        
+        def emit_endpoint(endpoint):
+            nonlocal count
+            emit(endpoint)
+            progress.endpoint_enriched()
+            count += 1
+            if count % 50 == 0:
+                print(f"   [{count}] Endpoints enriched...")
+        
+        # Lotes descritos em paralelo, com limite de requisições simultâneas e prazo por job
+        AsyncEnrichmentEngine(enricher).run(unique_endpoints, emit_endpoint)
+        
+        print(f"\n✅ {count} endpoints enriched")
+    
+    print(f"\n🤖 Extracting and enriching endpoints with descriptions in English as pages arrive...")
+    
+    progress = progress or ProgressTracker()
+    progress.set_stage("crawling")
+    
+    pages = pipeline.stage(crawl)
+    unique_endpoints = pipeline.stage(deduplicate, pages)
+    return pipeline.stage(enrich, unique_endpoints)
+
+
 def extract_complete_github_api(start_url: str, output_dir: str = "./mcp_servers", tool_name: str = "MyAPI",
-api_base_url: str = ""):
+api_base_url: str = "", max_pages: Optional[int] = CRAWL_MAX_PAGES, max_bytes: Optional[int] = CRAWL_MAX_BYTES,
+progress: Optional[ProgressTracker] = None):
+    """Gera o servidor MCP; progress recebe estágio e contadores ao longo do job"""
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_dir = f"{output_dir.rstrip('_')}_{timestamp}"
@@ -588,60 +1191,49 @@ api_base_url: str = ""):
     print(f"🚀 COMPLETE EXTRACTION OF {tool_name} API")
     print("="*70)
 
-    # 1. Navega e encontra TODAS as páginas
-    navigator = GitHubDocsNavigator()
-    all_pages = navigator.find_all_api_pages(start_url)
-
-    # 2. Extrai endpoints
-    print(f"\n📄 Extracting endpoints from {len(all_pages)} pages...")
-
-    all_endpoints_raw = []
-    for i, page_url in enumerate(all_pages, 1):
-        if i % 10 == 0:
-            print(f"   [{i}/{len(all_pages)}] Processed...")
-        endpoints = extract_endpoints_from_page(page_url)
-        for method, path, context in endpoints:
-            all_endpoints_raw.append((method, path, context, page_url))
-        time.sleep(0.1)
-
-    # Remove duplicatas
-    seen = set()
-    unique_endpoints = []
-    for method, path, context, url in all_endpoints_raw:
-        key = (method, path)
-        if key not in seen:
-            seen.add(key)
-            unique_endpoints.append((method, path, context, url))
-
-    print(f"\n✅ {len(unique_endpoints)} unique endpoints found")
-
-    # 3. Enriquece com descrições
-    print(f"\n🤖 Enriching with descriptions in English...")
-
-    enricher = EndpointEnricher(PERPLEXITY_API_KEY, tool_name)
-    enriched_endpoints = []
-
-    for i, (method, path, context, url) in enumerate(unique_endpoints, 1):
-        if i % 50 == 0:
-            print(f"   [{i}/{len(unique_endpoints)}] Processed...")
-        endpoint = enricher.enrich(method, path, context, url)
-        enriched_endpoints.append(endpoint)
-        time.sleep(0.2)
-
-    print(f"\n✅ {len(enriched_endpoints)} endpoints enriched")
-
-    # 4. Gera MCP com URL base dinâmica
-    if not api_base_url:
-        raise ValueError("API base URL must be provided")
-    generator = MCPGenerator(tool_name, api_base_url)
-    server_dir = generator.generate(enriched_endpoints, output_dir)
+    progress = progress or ProgressTracker()
+    http_cache = HTTPCache()
+    pipeline = Pipeline()
+    try:
+        # 0. Especificação OpenAPI publicada: dispensa o crawl e a raspagem do HTML
+        progress.set_stage("discovering")
+        spec = load_openapi_spec(start_url, http_cache, HTML_PARSER)
+        endpoints = []
+        if spec:
+            print(f"\n📘 OpenAPI {spec.version} specification found: {spec.url}")
+            progress.set_stage("openapi")
+            endpoints = endpoints_from_openapi(spec, tool_name)
+            progress.endpoint_found(len(endpoints))
+            progress.endpoints_complete()
+            progress.endpoint_enriched(len(endpoints))
+            api_base_url = api_base_url or spec.base_url
+            print(f"✅ {len(endpoints)} endpoints read from the specification")
+        
+        if not api_base_url:
+            raise ValueError("API base URL must be provided")
+        
+        if not endpoints:
+            # Limites por job: páginas visitadas e bytes baixados no crawl
+            endpoints = extract_endpoints_from_docs(start_url, tool_name, http_cache, pipeline,
+                                                    max_pages=max_pages, max_bytes=max_bytes, progress=progress)
+        
+        # 4. Gera MCP com URL base dinâmica, consumindo os endpoints à medida que ficam prontos
+        generator = MCPGenerator(tool_name, api_base_url)
+        server_dir = generator.generate(endpoints, output_dir)
+    finally:
+        # Em caso de erro, cancela os estágios que ainda estiverem rodando
+        pipeline.close()
+        http_cache.close()
+        # Gravado com o progresso do job (e exibido em /api/extraction/<id>)
+        progress.set_http_cache(http_cache.stats)
 
     # 5. Resumo final
     print(f"\n{'='*70}")
     print(f"✅ COMPLETED!")
     print(f"{'='*70}")
     print(f"\n📁 Server: {server_dir}/server.py")
-    print(f"📦 Tools: {len(enriched_endpoints)}")
+    print(f"📦 Tools: {generator.tool_count}")
+    print(f"🗄️  HTTP cache: {http_cache.summary()}")
     print(f"\n📝 To run:")
     print(f"   1. cd {server_dir}")
     print(f"   2. pip install -r requirements.txt")
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Pool de processos MCP persistentes
+Mantém servidores MCP vivos conversando JSON-RPC via stdio, com multiplexação por id
+"""
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+POOL_MIN_SIZE = int(os.getenv("MCP_POOL_MIN_SIZE", "0"))
+POOL_MAX_SIZE = int(os.getenv("MCP_POOL_MAX_SIZE", "4"))
+POOL_MAX_INFLIGHT = int(os.getenv("MCP_POOL_MAX_INFLIGHT", "8"))
+POOL_IDLE_TIMEOUT = float(os.getenv("MCP_POOL_IDLE_TIMEOUT", "300"))
+POOL_REAP_INTERVAL = 30.0
+CALL_TIMEOUT = float(os.getenv("MCP_CALL_TIMEOUT", "30"))
+# Servidor que não responde ao initialize é morto: senão prende a vaga de spawn do pool
+INIT_TIMEOUT = float(os.getenv("MCP_INIT_TIMEOUT", str(CALL_TIMEOUT)))
+
+PROTOCOL_VERSION = "2024-11-05"
+STREAM_LIMIT = 16 * 1024 * 1024  # respostas de API podem ser grandes
+STDERR_TAIL = 50
+
+
+class MCPProcessError(Exception):
+    """Erro de comunicação com um processo MCP"""
+
+
+class MCPProcess:
+    """Processo MCP de longa duração com várias requisições em voo"""
+
+    def __init__(self, server_path: str, init_timeout: float = INIT_TIMEOUT):
+        self.server_path = server_path
+        self.init_timeout = init_timeout
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.ids = itertools.count(1)
+        self.stderr_tail = deque(maxlen=STDERR_TAIL)
+        self.last_used = time.monotonic()
+        self.calls = 0
+        self.leases = 0
+        self.alive = False
+        self._write_lock = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def inflight(self) -> int:
+        return max(self.leases, len(self.pending))
+
+    async def start(self):
+        """Inicia o processo e executa o handshake MCP"""
+        self.proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            self.server_path,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=os.environ.copy(),
+            limit=STREAM_LIMIT
+        )
+        self.alive = True
+        self._tasks = [
+            asyncio.create_task(self._read_stdout()),
+            asyncio.create_task(self._read_stderr())
+        ]
+
+        try:
+            await asyncio.wait_for(self.request("initialize", {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "mcp-gateway", "version": "1.0.0"}
+            }), self.init_timeout)
+            await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        except asyncio.TimeoutError:
+            self._kill()
+            await self.close()
+            raise MCPProcessError(f"Servidor não respondeu ao initialize em {self.init_timeout:g}s")
+        except BaseException:
+            await self.close()
+            raise
+
+    async def request(self, method: str, params: Optional[Dict] = None) -> Dict:
+        """Envia uma requisição JSON-RPC e aguarda a resposta com o mesmo id"""
+        if not self.alive:
+            raise MCPProcessError(f"Processo encerrado: {self.describe_exit()}")
+
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.last_used = time.monotonic()
+        self.calls += 1
+
+        try:
+            await self._send({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": method,
+                "params": params or {}
+            })
+            return await future
+        except asyncio.CancelledError:
+            # Timeout ou cliente desconectado: avisa o servidor para abandonar o trabalho
+            if self.alive:
+                asyncio.create_task(self._notify_cancelled(request_id))
+            raise
+        finally:
+            self.pending.pop(request_id, None)
+            self.last_used = time.monotonic()
+
+    async def _notify_cancelled(self, request_id: int):
+        try:
+            await self._send({
+                "jsonrpc": "2.0",
+                "method": "notifications/cancelled",
+                "params": {"requestId": request_id, "reason": "Chamada cancelada pelo gateway"}
+            })
+        except MCPProcessError:
+            pass
+
+    async def _send(self, message: Dict):
+        data = (json.dumps(message) + "\n").encode()
+        async with self._write_lock:
+            try:
+                self.proc.stdin.write(data)
+                await self.proc.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError) as e:
+                self._mark_dead()
+                raise MCPProcessError(f"Falha ao escrever no processo: {e}")
+
+    async def _read_stdout(self):
+        try:
+            while True:
+                line = await self.proc.stdout.readline()
+                if not line:
+                    break
+
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                await self._dispatch(message)
+        except Exception as e:
+            self.stderr_tail.append(f"leitura interrompida: {e}")
+        finally:
+            self._mark_dead()
+
+    async def _read_stderr(self):
+        while True:
+            line = await self.proc.stderr.readline()
+            if not line:
+                break
+            self.stderr_tail.append(line.decode(errors="replace").rstrip())
+
+    async def _dispatch(self, message: Dict):
+        if "method" in message:
+            # Requisições do servidor (ping) precisam de resposta; notificações são ignoradas
+            if "id" in message:
+                await self._send({"jsonrpc": "2.0", "id": message["id"], "result": {}})
+            return
+
+        future = self.pending.get(message.get("id"))
+        if future and not future.done():
+            future.set_result(message)
+
+    def _mark_dead(self):
+        if not self.alive:
+            return
+        self.alive = False
+        error = MCPProcessError(f"Processo encerrado: {self.describe_exit()}")
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def describe_exit(self) -> str:
+        tail = "\n".join(self.stderr_tail)
+        return tail or "sem saída de erro"
+
+    def _kill(self):
+        if self.proc and self.proc.returncode is None:
+            try:
+                self.proc.kill()
+            except ProcessLookupError:
+                pass
+
+    async def close(self):
+        """Encerra o processo"""
+        self._mark_dead()
+        if self.proc and self.proc.returncode is None:
+            try:
+                self.proc.stdin.close()
+                await asyncio.wait_for(self.proc.wait(), timeout=2)
+            except Exception:
+                self._kill()
+                await self.proc.wait()
+        for task in self._tasks:
+            task.cancel()
+
+
+class ServerPool:
+    """Pool de processos de um único servidor MCP"""
+
+    def __init__(self, name: str, server_path: str, min_size: int = POOL_MIN_SIZE,
+                 max_size: int = POOL_MAX_SIZE, max_inflight: int = POOL_MAX_INFLIGHT,
+                 idle_timeout: float = POOL_IDLE_TIMEOUT):
+        self.name = name
+        self.server_path = server_path
+        self.min_size = min_size
+        self.max_size = max(1, max_size)
+        self.max_inflight = max(1, max_inflight)
+        self.idle_timeout = idle_timeout
+        self.processes: List[MCPProcess] = []
+        self.spawning = 0
+        self.spawned = 0
+        self.crashed = 0
+        self.calls = 0
+        self.last_error = ""
+        self._available = asyncio.Condition()
+        self._spawn_tasks = set()
+
+    async def _acquire(self) -> MCPProcess:
+        async with self._available:
+            failures = self.crashed
+            while True:
+                self._discard_dead()
+
+                candidates = [p for p in self.processes if p.inflight < self.max_inflight]
+                if candidates:
+                    process = min(candidates, key=lambda p: p.inflight)
+                    process.leases += 1
+                    return process
+
+                if not self.processes and not self.spawning and self.crashed > failures:
+                    raise MCPProcessError(f"Falha ao iniciar servidor: {self.last_error}")
+
+                if len(self.processes) + self.spawning < self.max_size:
+                    self._start_spawn()
+
+                await self._available.wait()
+
+    def _start_spawn(self):
+        # A inicialização roda em uma task própria: cancelar quem espera não deixa processos órfãos
+        self.spawning += 1
+        task = asyncio.create_task(self._spawn())
+        self._spawn_tasks.add(task)
+        task.add_done_callback(self._spawn_tasks.discard)
+
+    async def _spawn(self):
+        process = MCPProcess(self.server_path)
+        try:
+            await process.start()
+        except Exception as e:
+            async with self._available:
+                self.spawning -= 1
+                self.crashed += 1
+                self.last_error = str(e)
+                self._available.notify_all()
+            return
+
+        async with self._available:
+            self.spawning -= 1
+            self.spawned += 1
+            self.processes.append(process)
+            self._available.notify_all()
+
+    async def _release(self, process: MCPProcess):
+        async with self._available:
+            process.leases -= 1
+            self._available.notify_all()
+
+    def _discard_dead(self):
+        alive = [p for p in self.processes if p.alive]
+        self.crashed += len(self.processes) - len(alive)
+        self.processes = alive
+
+    async def call(self, method: str, params: Dict) -> Dict:
+        """Executa uma chamada JSON-RPC em um processo do pool"""
+        process = await self._acquire()
+        self.calls += 1
+        try:
+            return await process.request(method, params)
+        finally:
+            await self._release(process)
+
+    async def ensure_min_size(self):
+        """Mantém o número mínimo de processos aquecidos"""
+        async with self._available:
+            self._discard_dead()
+            missing = self.min_size - len(self.processes) - self.spawning
+            for _ in range(max(0, missing)):
+                self._start_spawn()
+
+    async def reap_idle(self):
+        """Encerra processos ociosos além do tamanho mínimo"""
+        now = time.monotonic()
+        async with self._available:
+            self._discard_dead()
+            idle = [p for p in self.processes
+                    if p.inflight == 0 and now - p.last_used > self.idle_timeout]
+            excess = max(0, len(self.processes) - self.min_size)
+            to_close = idle[:excess]
+            self.processes = [p for p in self.processes if p not in to_close]
+
+        for process in to_close:
+            await process.close()
+
+    async def close(self):
+        for task in list(self._spawn_tasks):
+            task.cancel()
+        async with self._available:
+            processes, self.processes = self.processes, []
+        for process in processes:
+            await process.close()
+
+    def stats(self) -> Dict[str, Any]:
+        alive = [p for p in self.processes if p.alive]
+        busy = len([p for p in alive if p.inflight > 0])
+        return {
+            "name": self.name,
+            "path": self.server_path,
+            "size": len(alive),
+            "busy": busy,
+            "idle": len(alive) - busy,
+            "inflight": sum(p.inflight for p in alive),
+            "spawning": self.spawning,
+            "spawned": self.spawned,
+            "crashed": self.crashed + len(self.processes) - len(alive),
+            "calls": self.calls,
+            "min_size": self.min_size,
+            "max_size": self.max_size
+        }
+
+
+class MCPPoolManager:
+    """Gerencia um pool de processos por servidor MCP registrado"""
+
+    def __init__(self, reap_interval: float = POOL_REAP_INTERVAL):
+        self.pools: Dict[str, ServerPool] = {}
+        self.reap_interval = reap_interval
+        self._reaper: Optional[asyncio.Task] = None
+
+    def get_pool(self, server: Dict) -> ServerPool:
+        key = server["name"].lower()
+        pool = self.pools.get(key)
+        if pool and pool.server_path != server["path"]:
+            # Servidor regenerado em outro diretório: descarta os processos antigos
+            asyncio.create_task(pool.close())
+            pool = None
+        if pool is None:
+            pool = ServerPool(server["name"], server["path"])
+            self.pools[key] = pool
+        return pool
+
+    async def call_tool(self, server: Dict, tool_name: str, arguments: Dict,
+                        timeout: float = CALL_TIMEOUT) -> Dict:
+        """Chama uma tool reaproveitando um processo aquecido
+
+        O timeout cobre a espera por um processo livre e a execução da tool;
+        ao expirar, a requisição é cancelada também no servidor MCP.
+        """
+        self._ensure_reaper()
+        pool = self.get_pool(server)
+        return await asyncio.wait_for(
+            pool.call("tools/call", {"name": tool_name, "arguments": arguments}),
+            timeout=timeout
+        )
+
+    async def start(self, servers: Optional[List[Dict]] = None):
+        for server in servers or []:
+            await self.get_pool(server).ensure_min_size()
+        self._ensure_reaper()
+
+    def _ensure_reaper(self):
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_loop())
+
+    async def _reap_loop(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            for pool in list(self.pools.values()):
+                try:
+                    await pool.reap_idle()
+                    await pool.ensure_min_size()
+                except Exception as e:
+                    print(f"Erro ao reciclar pool {pool.name}: {e}")
+
+    async def close(self):
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
+        for pool in list(self.pools.values()):
+            await pool.close()
+        self.pools.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        pools = [pool.stats() for pool in self.pools.values()]
+        totals = {
+            key: sum(p[key] for p in pools)
+            for key in ("size", "busy", "idle", "inflight", "spawned", "crashed", "calls")
+        }
+        return {"totals": totals, "pools": pools}
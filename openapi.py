@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Leitura de especificações OpenAPI/Swagger
+Detecta a especificação (URL direta ou link na página inicial) e percorre as operações
+em streaming, sem precisar raspar o HTML da documentação
+"""
+import io
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from http_cache import HTTPCache
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+HTTP_METHODS = ("get", "post", "put", "delete", "patch")
+MAX_SPEC_LINKS = 5  # links candidatos testados a partir da página inicial
+
+JSON_SPEC_REGEX = re.compile(rb'"(?:openapi|swagger)"\s*:\s*"[23]\.')
+YAML_SPEC_REGEX = re.compile(rb'^(?:openapi|swagger)\s*:\s*["\']?[23]\.', re.MULTILINE)
+SPEC_LINK_REGEX = re.compile(r'\.(?:json|ya?ml)(?:[?#]|$)', re.IGNORECASE)
+SPEC_HINT_REGEX = re.compile(r'openapi|swagger|api[-_ ]?(?:spec|description|definition)', re.IGNORECASE)
+
+
+@dataclass
+class OpenAPIOperation:
+    method: str
+    path: str
+    summary: str = ""
+    description: str = ""
+    parameters: List[Dict] = field(default_factory=list)
+
+
+def _json_backend():
+    """Backend do ijson em C; o backend puro Python é mais lento que o json.loads"""
+    if ijson is None:
+        return None
+    for name in ("yajl2_c", "yajl2_cffi"):
+        try:
+            return ijson.get_backend(name)
+        except ImportError:
+            continue
+    return None
+
+
+def detect_spec_format(body: bytes) -> Optional[str]:
+    """Retorna 'json' ou 'yaml' se o corpo for uma especificação OpenAPI/Swagger"""
+    head = body[:512].lstrip(b"\xef\xbb\xbf \t\r\n")
+    if head.startswith(b"{"):
+        return "json" if JSON_SPEC_REGEX.search(body) else None
+    if head.startswith(b"<"):
+        return None
+    return "yaml" if YAML_SPEC_REGEX.search(body) else None
+
+
+class OpenAPISpec:
+    """Especificação carregada; as operações são lidas sob demanda"""
+
+    def __init__(self, url: str, body: bytes, spec_format: str):
+        self.url = url
+        self.format = spec_format
+        self._body = body
+        self._backend = _json_backend() if spec_format == "json" else None
+        self._document = None
+        self.version = ""
+        self.base_url = ""
+        self._read_header()
+
+    def _load_document(self) -> Dict:
+        # Sem parser em streaming (ou YAML): carrega o documento inteiro uma única vez
+        if self._document is None:
+            if self.format == "yaml":
+                if yaml is None:
+                    raise RuntimeError("PyYAML não instalado: especificação YAML não suportada")
+                loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+                self._document = yaml.load(self._body, Loader=loader) or {}
+            else:
+                self._document = json.loads(self._body)
+        return self._document
+
+    def _read_header(self):
+        """Versão e URL base, sem construir a árvore de paths"""
+        servers: List[str] = []
+        swagger = {}
+
+        if self._backend:
+            for prefix, event, value in self._backend.parse(io.BytesIO(self._body)):
+                if prefix in ("openapi", "swagger", "host", "basePath") and event == "string":
+                    swagger[prefix] = value
+                elif prefix == "schemes.item" and event == "string":
+                    swagger.setdefault("schemes", value)
+                elif prefix == "servers.item.url" and event == "string":
+                    servers.append(value)
+        else:
+            document = self._load_document()
+            for key in ("openapi", "swagger", "host", "basePath"):
+                if isinstance(document.get(key), str):
+                    swagger[key] = document[key]
+            schemes = document.get("schemes") or []
+            if schemes:
+                swagger["schemes"] = schemes[0]
+            servers = [s.get("url", "") for s in document.get("servers") or [] if isinstance(s, dict)]
+
+        self.version = swagger.get("openapi") or swagger.get("swagger") or ""
+
+        # URLs com variáveis de servidor ({region}) não são resolvidas
+        servers = [s for s in servers if s and "{" not in s]
+        if servers:
+            self.base_url = urljoin(self.url, servers[0]).rstrip("/")
+        elif swagger.get("host"):
+            scheme = swagger.get("schemes", "https")
+            self.base_url = f"{scheme}://{swagger['host']}{swagger.get('basePath', '')}".rstrip("/")
+
+    def _items(self, prefix: str) -> Iterator:
+        """Pares chave/valor do objeto em `prefix` (ex.: 'paths'), um por vez"""
+        if self._backend:
+            yield from self._backend.kvitems(io.BytesIO(self._body), prefix)
+            return
+        node = self._load_document()
+        for key in prefix.split("."):
+            node = node.get(key) if isinstance(node, dict) else None
+        if isinstance(node, dict):
+            yield from node.items()
+
+    def _shared_parameters(self) -> Dict[str, Dict]:
+        # OpenAPI 3: components.parameters; Swagger 2: parameters na raiz
+        prefix = "parameters" if self.version.startswith("2") else "components.parameters"
+        return {name: param for name, param in self._items(prefix) if isinstance(param, dict)}
+
+    def operations(self) -> Iterator[OpenAPIOperation]:
+        """Percorre as operações na ordem da especificação"""
+        shared = self._shared_parameters()
+
+        def resolve(param):
+            ref = param.get("$ref") if isinstance(param, dict) else None
+            if ref:
+                param = shared.get(ref.rsplit("/", 1)[-1])
+            return param if isinstance(param, dict) and param.get("name") else None
+
+        for path, item in self._items("paths"):
+            if not isinstance(item, dict):
+                continue
+
+            common = [p for p in map(resolve, item.get("parameters") or []) if p]
+
+            for method in HTTP_METHODS:
+                operation = item.get(method)
+                if not isinstance(operation, dict):
+                    continue
+
+                # Parâmetros da operação sobrescrevem os do path (mesmo nome e local)
+                parameters = {(p["name"], p.get("in")): p for p in common}
+                for param in map(resolve, operation.get("parameters") or []):
+                    if param:
+                        parameters[(param["name"], param.get("in"))] = param
+
+                yield OpenAPIOperation(
+                    method=method.upper(),
+                    path=path,
+                    summary=operation.get("summary") or "",
+                    description=operation.get("description") or "",
+                    parameters=list(parameters.values())
+                )
+
+
+def find_spec_links(soup: BeautifulSoup, page_url: str) -> List[str]:
+    """Links da página que parecem apontar para uma especificação OpenAPI"""
+    links = []
+    for tag in soup.find_all(["a", "link"], href=True):
+        href = tag["href"]
+        if not SPEC_LINK_REGEX.search(href):
+            continue
+        hint = " ".join([href, tag.get_text(" "), " ".join(tag.get("rel") or []), tag.get("type") or ""])
+        if SPEC_HINT_REGEX.search(hint):
+            url = urljoin(page_url, href.split("#")[0])
+            if url not in links:
+                links.append(url)
+    return links
+
+
+def load_openapi_spec(start_url: str, cache: HTTPCache, html_parser: str = "html.parser") -> Optional[OpenAPISpec]:
+    """Carrega a especificação em start_url ou linkada a partir dela; None se não houver"""
+    try:
+        status, body = cache.fetch(start_url)
+    except Exception as e:
+        print(f"  ⚠️ Erro ao acessar {start_url}: {e}")
+        return None
+    if status != 200:
+        return None
+
+    spec_format = detect_spec_format(body)
+    if spec_format:
+        return OpenAPISpec(start_url, body, spec_format)
+
+    soup = BeautifulSoup(body, html_parser)
+    for link in find_spec_links(soup, start_url)[:MAX_SPEC_LINKS]:
+        try:
+            status, body = cache.fetch(link)
+        except Exception as e:
+            print(f"  ⚠️ Erro ao acessar {link}: {e}")
+            continue
+        spec_format = detect_spec_format(body) if status == 200 else None
+        if spec_format:
+            return OpenAPISpec(link, body, spec_format)
+
+    return None
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Dicionário de parâmetros conhecidos usado no enriquecimento dos endpoints
+Carregado de um JSON (PARAMETER_DICTIONARY) e compilado uma vez, de forma que todos os
+parâmetros de query são encontrados em uma só passada pelo contexto
+"""
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PARAMETER_DICTIONARY_FILE = Path(os.getenv("PARAMETER_DICTIONARY", Path(__file__).with_name("parameters.json")))
+
+WORD_REGEX = re.compile(r'\w+')
+
+
+class ParameterDictionary:
+    """Descrições de parâmetros de path e parâmetros de query reconhecidos no contexto"""
+
+    def __init__(self, path_parameters: Dict[str, str], query_parameters: Dict[str, Tuple[str, str]]):
+        self.path_parameters = dict(path_parameters)
+        self.query_parameters = dict(query_parameters)
+        self._by_lower = {name.lower(): name for name in self.query_parameters}
+        self._order = {lower: i for i, lower in enumerate(self._by_lower)}
+
+        # Nomes que são uma palavra só (o caso comum) viram um conjunto: basta tokenizar o
+        # contexto uma vez, com custo que não cresce com o vocabulário. Os demais (ex.:
+        # "filter[state]") entram em um único regex com limites de palavra.
+        self._words = {lower for lower in self._by_lower if WORD_REGEX.fullmatch(lower)}
+        others = sorted((lower for lower in self._by_lower if lower not in self._words), key=len, reverse=True)
+        self._regex = re.compile(r'(?<!\w)(?:' + '|'.join(map(re.escape, others)) + r')(?!\w)') if others else None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ParameterDictionary":
+        query = {}
+        for name, spec in (data.get("query_parameters") or {}).items():
+            if isinstance(spec, dict):
+                query[name] = (spec.get("type", "string"), spec.get("description", ""))
+            else:
+                query[name] = ("string", str(spec))
+        return cls(data.get("path_parameters") or {}, query)
+
+    @classmethod
+    def load(cls, path: Path = PARAMETER_DICTIONARY_FILE) -> "ParameterDictionary":
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Erro ao carregar dicionário de parâmetros {path}: {e}")
+            return cls({}, {})
+
+    def path_description(self, name: str) -> str:
+        return self.path_parameters.get(name, f'The {name}')
+
+    def find_query_parameters(self, context: str) -> List[str]:
+        """Parâmetros de query mencionados no contexto, na ordem do dicionário"""
+        if not self._by_lower:
+            return []
+        lowered = context.lower()
+        found = self._words.intersection(WORD_REGEX.findall(lowered))
+        if self._regex:
+            found.update(self._regex.findall(lowered))
+        return [self._by_lower[lower] for lower in sorted(found, key=self._order.__getitem__)]
+
+
+_default_dictionary: Optional[ParameterDictionary] = None
+_default_dictionary_lock = threading.Lock()
+
+
+def get_parameter_dictionary() -> ParameterDictionary:
+    """Dicionário padrão, carregado uma vez por processo"""
+    global _default_dictionary
+    with _default_dictionary_lock:
+        if _default_dictionary is None:
+            _default_dictionary = ParameterDictionary.load()
+        return _default_dictionary
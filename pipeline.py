@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Pipeline de estágios em threads ligados por filas limitadas
+Cada estágio consome a saída do anterior assim que ela fica pronta; filas cheias
+seguram o produtor (memória limitada) e erros seguem para o consumidor final
+"""
+import os
+import queue
+import threading
+from typing import Any, Callable, Iterator, List
+
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+POLL_INTERVAL = 0.2  # intervalo para checar cancelamento enquanto bloqueado em uma fila
+
+_END = object()
+
+
+class PipelineCancelled(Exception):
+    """O pipeline foi encerrado antes de o estágio terminar"""
+
+
+class _StageFailed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class Pipeline:
+    """Conjunto de estágios; close() cancela o que ainda estiver rodando e aguarda as threads"""
+
+    def __init__(self, queue_size: int = PIPELINE_QUEUE_SIZE):
+        self.queue_size = max(1, queue_size)
+        self._cancelled = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def stage(self, target: Callable[..., None], *args: Any) -> Iterator:
+        """Roda target(*args, emit) em uma thread e retorna um iterador sobre o que ela emitir"""
+        items: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        def emit(item):
+            self._put(items, item)
+
+        def run():
+            try:
+                target(*args, emit)
+            except PipelineCancelled:
+                return
+            except BaseException as e:
+                self._put(items, _StageFailed(e), final=True)
+                return
+            self._put(items, _END, final=True)
+
+        thread = threading.Thread(target=run, name=f"pipeline-{target.__name__}", daemon=True)
+        self._threads.append(thread)
+        thread.start()
+        return self._iterate(items)
+
+    def _put(self, items: queue.Queue, item: Any, final: bool = False):
+        while not self._cancelled.is_set():
+            try:
+                items.put(item, timeout=POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+        if not final:
+            raise PipelineCancelled()
+
+    def _iterate(self, items: queue.Queue) -> Iterator:
+        while True:
+            try:
+                item = items.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self._cancelled.is_set():
+                    raise PipelineCancelled()
+                continue
+            if item is _END:
+                return
+            if isinstance(item, _StageFailed):
+                raise item.error
+            yield item
+
+    def close(self):
+        self._cancelled.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Progresso de uma extração em andamento
+Contadores atualizados pelos estágios do pipeline e gravados em lote por uma thread
+própria, no máximo uma vez por intervalo, sem bloquear o crawl nem o enriquecimento
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+PROGRESS_INTERVAL = float(os.getenv("PROGRESS_INTERVAL", "1.0"))  # segundos entre gravações por job
+
+
+class ProgressTracker:
+    """Estágio, páginas, endpoints e ETA de um job
+
+    on_update recebe um snapshot (dict) sempre que algo mudou desde a última gravação;
+    sem ele o tracker só acumula os contadores.
+    """
+
+    def __init__(self, on_update: Optional[Callable[[Dict], None]] = None,
+                 interval: float = PROGRESS_INTERVAL):
+        self.on_update = on_update
+        self.interval = interval
+        self.stage = "starting"
+        self.pages_fetched = 0
+        self.endpoints_found = 0
+        self.endpoints_enriched = 0
+        self._started = time.monotonic()
+        self._enrich_started: Optional[float] = None
+        self._found_final = False
+        self.http_cache: Optional[Dict] = None  # contadores do cache HTTP, no fim do job
+        self._lock = threading.Lock()
+        self._dirty = True
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if on_update:
+            self._thread = threading.Thread(target=self._flush_loop, name="progress", daemon=True)
+            self._thread.start()
+
+    def set_stage(self, stage: str):
+        with self._lock:
+            self.stage = stage
+            self._dirty = True
+
+    def page_fetched(self):
+        with self._lock:
+            self.pages_fetched += 1
+            self._dirty = True
+
+    def endpoint_found(self, count: int = 1):
+        with self._lock:
+            self.endpoints_found += count
+            self._dirty = True
+
+    def endpoints_complete(self):
+        """Não surgem mais endpoints: a partir daqui o ETA pode ser estimado"""
+        with self._lock:
+            self._found_final = True
+            self._dirty = True
+
+    def endpoint_enriched(self, count: int = 1):
+        with self._lock:
+            if self._enrich_started is None:
+                self._enrich_started = time.monotonic()
+            self.endpoints_enriched += count
+            self._dirty = True
+
+    def set_http_cache(self, stats: Dict):
+        with self._lock:
+            self.http_cache = dict(stats)
+            self._dirty = True
+    
+    def _eta(self, now: float) -> Optional[float]:
+        # Só há estimativa honesta quando o total é conhecido e já existe ritmo de enriquecimento
+        remaining = self.endpoints_found - self.endpoints_enriched
+        if not self._found_final or self._enrich_started is None or self.endpoints_enriched == 0:
+            return None
+        if remaining <= 0:
+            return 0.0
+        elapsed = now - self._enrich_started
+        if elapsed <= 0:
+            return None
+        return round(remaining * elapsed / self.endpoints_enriched, 1)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "stage": self.stage,
+                "pages_fetched": self.pages_fetched,
+                "endpoints_found": self.endpoints_found,
+                "endpoints_enriched": self.endpoints_enriched,
+                "eta_seconds": self._eta(now),
+                "elapsed_seconds": round(now - self._started, 1),
+                "http_cache": self.http_cache,
+            }
+
+    def _take(self) -> Optional[Dict]:
+        with self._lock:
+            if not self._dirty:
+                return None
+            self._dirty = False
+        return self.snapshot()
+
+    def flush(self):
+        snapshot = self._take()
+        if snapshot is not None and self.on_update:
+            try:
+                self.on_update(snapshot)
+            except Exception as e:
+                print(f"  ⚠️ Erro ao gravar progresso: {e}")
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.interval):
+            self.flush()
+
+    def close(self, stage: Optional[str] = None):
+        """Para a thread e grava o estado final"""
+        if stage:
+            self.set_stage(stage)
+        self._closed.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
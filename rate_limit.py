@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Limite de requisições por host com token bucket
+Um único limitador por processo, compartilhado pelos jobs simultâneos do worker,
+usado tanto por código síncrono (threads) quanto assíncrono (event loops)
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", "10"))  # requisições/s por host (0 = sem limite)
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_HOSTS = os.getenv("RATE_LIMIT_HOSTS", "")  # "host=rps[:burst],..." sobrescreve por host
+
+
+def _parse_host_limits(spec: str) -> Dict[str, Tuple[float, int]]:
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            host, value = item.split("=", 1)
+            rate, _, burst = value.partition(":")
+            limits[host.strip().lower()] = (float(rate), int(burst) if burst else max(1, int(float(rate))))
+        except ValueError:
+            print(f"Limite de host inválido em RATE_LIMIT_HOSTS: {item}")
+    return limits
+
+
+class TokenBucket:
+    """Bucket com `rate` fichas/s e capacidade `burst`
+
+    Cada chamada reserva uma ficha na hora (o saldo pode ficar negativo) e só então
+    espera o tempo correspondente, de forma que chamadores são atendidos em ordem.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserva uma ficha e retorna quanto tempo esperar por ela"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class HostRateLimiter:
+    """Um token bucket por host"""
+
+    def __init__(self, rate: float = RATE_LIMIT_RPS, burst: int = RATE_LIMIT_BURST,
+                 host_limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.rate = rate
+        self.burst = burst
+        self._configured = _parse_host_limits(RATE_LIMIT_HOSTS) if host_limits is None else dict(host_limits)
+        self._limits = dict(self._configured)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def set_host_limit(self, host: str, rate: float, burst: int):
+        """Define o limite padrão de um host; RATE_LIMIT_HOSTS tem precedência"""
+        host = host.lower()
+        with self._lock:
+            if host in self._configured:
+                return
+            self._limits[host] = (rate, burst)
+            self._buckets.pop(host, None)
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = (urlparse(url).netloc or url).lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self._limits.get(host, (self.rate, self.burst))
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            return bucket
+
+    def acquire(self, url: str):
+        """Bloqueia até haver ficha para o host da URL"""
+        self.bucket(url).acquire()
+
+    async def acquire_async(self, url: str):
+        await self.bucket(url).acquire_async()
+
+
+rate_limiter = HostRateLimiter()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Registro de servidores MCP em memória
+Mantém o mcp_registry.json carregado, com busca por nome indexada e recarga por mudança no arquivo
+"""
+import errno
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+REGISTRY_FILE = Path(os.getenv("REGISTRY_FILE", "./mcp_registry.json"))
+REGISTRY_FILE_MODE = 0o644  # permissão de um registro novo (um existente mantém a sua)
+CHECK_INTERVAL = 1.0  # intervalo mínimo entre verificações do arquivo (segundos)
+
+
+class MCPRegistry:
+    """Registro de servidores MCP com índice nome (sem caixa) -> servidor"""
+
+    def __init__(self, path: Path = REGISTRY_FILE, check_interval: float = CHECK_INTERVAL):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._servers: List[Dict] = []
+        self._by_name: Dict[str, Dict] = {}
+        self._signature: Optional[Tuple] = None
+        self._last_check = 0.0
+        self._loaded = False
+
+    def _file_signature(self) -> Optional[Tuple]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _refresh(self, force: bool = False):
+        now = time.monotonic()
+        if not force and self._loaded and now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        signature = self._file_signature()
+        if not force and self._loaded and signature == self._signature:
+            return
+
+        servers = []
+        if signature is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    servers = json.load(f).get("servers", [])
+            except (OSError, ValueError) as e:
+                if self._loaded:
+                    # Arquivo sendo escrito por outro processo: mantém a versão em memória
+                    print(f"Erro ao recarregar registro: {e}")
+                    return
+
+        self._set_servers(servers)
+        self._signature = signature
+        self._loaded = True
+
+    def _set_servers(self, servers: List[Dict]):
+        self._servers = servers
+        self._by_name = {}
+        for server in servers:
+            self._by_name.setdefault(server["name"].lower(), server)
+
+    def reload(self):
+        """Força a releitura do arquivo"""
+        with self._lock:
+            self._refresh(force=True)
+
+    def servers(self) -> List[Dict]:
+        """Lista os servidores registrados"""
+        with self._lock:
+            self._refresh()
+            return list(self._servers)
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Busca um servidor pelo nome, sem diferenciar maiúsculas"""
+        with self._lock:
+            self._refresh()
+            return self._by_name.get(name.lower())
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._servers)
+
+    def register(self, server_info: Dict) -> bool:
+        """Registra ou atualiza um servidor; retorna True se for novo"""
+        return bool(self.register_many([server_info], update_existing=True))
+
+    def register_many(self, servers: List[Dict], update_existing: bool = False) -> List[Dict]:
+        """Registra vários servidores com uma única escrita; retorna os novos"""
+        with self._lock:
+            self._refresh(force=True)
+            new_servers = []
+            changed = False
+
+            for server in servers:
+                existing = self._by_name.get(server["name"].lower())
+                if existing is None:
+                    self._servers.append(server)
+                    self._by_name[server["name"].lower()] = server
+                    new_servers.append(server)
+                    changed = True
+                elif update_existing:
+                    existing.update(server)
+                    changed = True
+
+            if changed:
+                self._save()
+            return new_servers
+
+    def replace(self, servers: List[Dict]):
+        """Substitui todo o conteúdo do registro"""
+        with self._lock:
+            self._set_servers(list(servers))
+            self._save()
+
+    def _save(self):
+        # Escrita atômica: arquivo temporário no mesmo diretório + rename
+        directory = self.path.parent
+        try:
+            mode = os.stat(self.path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = REGISTRY_FILE_MODE
+
+        fd, tmp_path = tempfile.mkstemp(prefix=".mcp_registry.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"servers": self._servers}, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp cria com 0600: mantém a permissão que o registro já tinha
+            os.chmod(tmp_path, mode)
+            try:
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                # Arquivo montado individualmente (bind mount do docker-compose) não aceita rename
+                if e.errno not in (errno.EBUSY, errno.EXDEV):
+                    raise
+                os.unlink(tmp_path)
+                self._write_in_place()
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._signature = self._file_signature()
+        self._last_check = time.monotonic()
+        self._loaded = True
+
+    def _write_in_place(self):
+        """Reescreve o próprio arquivo; leitores que pegarem a escrita pela metade mantêm a versão anterior"""
+        with open(self.path, 'w') as f:
+            json.dump({"servers": self._servers}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
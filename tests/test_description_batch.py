@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Descrições em lote: DESCRIPTION_BATCH_SIZE endpoints por requisição ao LLM
+Um servidor http.server local faz o papel da API da Perplexity e, conforme o path do
+endpoint, omite o item, devolve um id fora do intervalo ou um item malformado
+"""
+import json
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+from description_cache import DescriptionCache, description_key  # noqa: E402
+
+LISTING_REGEX = re.compile(r'^(\d+)\. METHOD: (\S+) \| PATH: (\S+)', re.MULTILINE)
+SINGLE_REGEX = re.compile(r'^METHOD: (\S+)\nPATH: (\S+)', re.MULTILINE)
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = body['messages'][0]['content']
+        self.server.prompts.append(prompt)
+
+        single = SINGLE_REGEX.search(prompt)
+        if single:
+            # Endpoint sozinho na requisição: o prompt pede só o texto da descrição
+            self._reply(f"Stub {single.group(1)} {single.group(2)}")
+            return
+
+        answer = []
+        listing = LISTING_REGEX.findall(prompt)
+        for index, method, path in listing:
+            if 'missing' in path:
+                continue
+            if 'outofrange' in path:
+                answer.append({"id": len(listing) + 5, "description": f"Stub {method} {path}"})
+            elif 'malformed' in path:
+                answer.append({"id": index, "description": f"Stub {method} {path}"})
+            else:
+                answer.append({"id": int(index), "description": f"Stub {method} {path}"})
+        self._reply("Here you go:\n" + json.dumps(answer))
+
+    def _reply(self, content):
+        payload = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubLLMHandler)
+    server.prompts = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/chat/completions"
+    monkeypatch.setattr(main, "PERPLEXITY_API_URL", url)
+    monkeypatch.setattr(main, "DESCRIPTION_BATCH_SIZE", 4)
+    main.rate_limiter.set_host_limit(f"127.0.0.1:{server.server_address[1]}", 1000, 100)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def generator(tmp_path):
+    cache = DescriptionCache(str(tmp_path / "descriptions.sqlite3"))
+    return main.DescriptionGenerator("test-key", "Demo", cache=cache)
+
+
+def endpoints(*paths):
+    return [("GET", path, f"Context for {path}") for path in paths]
+
+
+def cache_key(method, path, context):
+    return description_key("Demo", method, path, context[:300], main.SONAR_MODEL)
+
+
+def test_uncached_endpoints_are_batched(llm, generator):
+    items = endpoints(*(f"/items/{i}" for i in range(10)))
+    descriptions = generator.generate_descriptions(items)
+
+    assert len(llm.prompts) == 3  # 4 + 4 + 2
+    assert descriptions == [f"Stub GET /items/{i}" for i in range(10)]
+
+
+def test_missing_out_of_range_and_malformed_ids_fall_back_per_item(llm, generator):
+    items = endpoints("/ok/1", "/missing/1", "/outofrange/1", "/malformed/1", "/ok/2")
+    descriptions = generator.generate_descriptions(items)
+
+    assert len(llm.prompts) == 2
+    assert descriptions == [
+        "Stub GET /ok/1",
+        generator._fallback_description("GET", "/missing/1"),
+        generator._fallback_description("GET", "/outofrange/1"),
+        generator._fallback_description("GET", "/malformed/1"),
+        "Stub GET /ok/2",
+    ]
+
+
+def test_fallbacks_are_not_cached(llm, generator):
+    items = endpoints("/ok/1", "/missing/1", "/malformed/1")
+    generator.generate_descriptions(items)
+
+    assert generator.cache.get(cache_key(*items[0])) == "Stub GET /ok/1"
+    assert generator.cache.get(cache_key(*items[1])) is None
+    assert generator.cache.get(cache_key(*items[2])) is None
+
+    # Só os que caíram no fallback voltam a ser pedidos
+    llm.prompts.clear()
+    generator.generate_descriptions(items)
+    assert len(llm.prompts) == 1
+    assert "/ok/1" not in llm.prompts[0]
+    assert "/missing/1" in llm.prompts[0] and "/malformed/1" in llm.prompts[0]
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+extract_endpoints_from_soup precisa devolver exatamente o mesmo que a versão anterior,
+que normalizava o get_text() de cada bloco e rodava o ENDPOINT_REGEX bloco a bloco
+Comparação diferencial em páginas aleatórias (semente fixa) e na página sintética de documentação
+"""
+import random
+import re
+import sys
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "docs_labels_page.html"
+SEED = 20240901
+DOCUMENTS = 4000
+
+PARSERS = ["html.parser"]
+try:
+    import lxml  # noqa: F401
+    PARSERS.append("lxml")
+except ImportError:
+    pass
+
+# Peças que exercitam os casos difíceis: método e path em nós de texto diferentes, blocos
+# aninhados cortando um match, espaços variados, paths que terminam em nome de método
+WORDS = ["GET", "POST", "PUT", "DELETE", "PATCH", "/repos", "/{owner}", "/x-y", "/a_b", "x", "-",
+         "(", ")", "/", "GET /users", "POST /orgs/{org}/", "GETS", "lorem", "ipsum" * 30, ".",
+         "{id}", "/v1/items", "/itemsGET", "DELETE /a/b/PATCH"]
+SPACES = [" ", "  ", "\n", "\t", "", "\xa0", ""]
+TAGS = ["div", "code", "pre", "span", "p", "table", "b", "div", "div"]
+
+
+def reference_extract(soup: BeautifulSoup):
+    """Implementação anterior, bloco a bloco"""
+    endpoints = []
+    seen = set()
+
+    for block in soup.find_all(['pre', 'code', 'table', 'div']):
+        text = ' '.join(block.get_text().split())
+
+        for match in main.ENDPOINT_REGEX.finditer(text):
+            method = match.group(1)
+            path = match.group(2).rstrip('/')
+            path = re.sub(r'(GET|POST|PUT|DELETE|PATCH)$', '', path)
+
+            key = (method, path)
+            if key in seen or len(path) < 3:
+                continue
+
+            seen.add(key)
+            start = max(0, match.start() - 200)
+            end = min(len(text), match.end() + 200)
+            endpoints.append((method, path, text[start:end]))
+
+    return endpoints
+
+
+def random_fragment(rng: random.Random, depth: int = 0) -> str:
+    parts = []
+    for _ in range(rng.randint(0, 5)):
+        roll = rng.random()
+        if roll < 0.35 and depth < 6:
+            tag = rng.choice(TAGS)
+            parts.append(f"<{tag}>{random_fragment(rng, depth + 1)}</{tag}>")
+        elif roll < 0.4:
+            parts.append("<!--GET /comment-->")
+        elif roll < 0.43:
+            parts.append("<script>GET /script</script>")
+        else:
+            parts.append(rng.choice(SPACES) + rng.choice(WORDS) + rng.choice(SPACES))
+    return "".join(parts)
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+def test_matches_per_block_extraction_on_random_pages(parser):
+    rng = random.Random(SEED)
+    for _ in range(DOCUMENTS):
+        html = f"<html><body>{random_fragment(rng)}</body></html>"
+        soup = BeautifulSoup(html, parser)
+        assert main.extract_endpoints_from_soup(soup) == reference_extract(soup), html
+
+
+@pytest.mark.parametrize("html", [
+    "<div>GET<code> /repos/{owner}</code></div>",
+    "<div><pre>POST</pre> /orgs/x</div>",
+    "<div>DELETE /a/<b>b</b>/c <div>PATCH /a/b/PATCH</div></div>",
+    "<table><tr><td>PUT</td><td>/x/y</td></tr></table><div>PUT /x/y</div>",
+    "<div><div><div>GET /deep/path</div> tail</div> more GET /deep/path/2</div>",
+])
+@pytest.mark.parametrize("parser", PARSERS)
+def test_matches_per_block_extraction_on_edge_cases(html, parser):
+    soup = BeautifulSoup(html, parser)
+    assert main.extract_endpoints_from_soup(soup) == reference_extract(soup)
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+def test_matches_per_block_extraction_on_docs_page(parser):
+    soup = BeautifulSoup(FIXTURE.read_bytes(), parser)
+    endpoints = main.extract_endpoints_from_soup(soup)
+    assert endpoints
+    assert endpoints == reference_extract(soup)
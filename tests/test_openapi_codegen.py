@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+O server.py gerado a partir de uma especificação OpenAPI precisa compilar e cada tool só
+pode usar nomes que ela mesma define (argumentos, variáveis locais ou globais do servidor)
+"""
+import ast
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import MCPGenerator, endpoints_from_openapi  # noqa: E402
+from openapi import OpenAPISpec  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "openapi_sample.json"
+SERVER_GLOBALS = {"httpx", "mcp", "get_headers", "Optional", "str"}
+
+
+def generate_server(spec_path: Path = FIXTURE) -> str:
+    spec = OpenAPISpec(spec_path.as_uri(), spec_path.read_bytes(), "json")
+    endpoints = endpoints_from_openapi(spec, "Sample")
+    with tempfile.TemporaryDirectory() as output_dir:
+        server_dir = MCPGenerator("Sample", spec.base_url).generate(endpoints, output_dir)
+        return (server_dir / "server.py").read_text(encoding="utf-8")
+
+
+def tools(tree: ast.Module):
+    return [node for node in tree.body if isinstance(node, ast.AsyncFunctionDef)
+            and any(isinstance(d, ast.Call) and getattr(d.func, "attr", "") == "call_tool"
+                    for d in node.decorator_list)]
+
+
+def undefined_names(function: ast.AsyncFunctionDef) -> set:
+    defined = {arg.arg for arg in function.args.args} | SERVER_GLOBALS
+    for node in ast.walk(function):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            defined.add(node.id)
+    return {node.id for node in ast.walk(function)
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in defined}
+
+
+def test_generated_server_compiles():
+    source = generate_server()
+    compile(source, "server.py", "exec")
+
+
+def test_tools_only_use_defined_names():
+    tree = ast.parse(generate_server())
+    generated = tools(tree)
+    assert len(generated) == 5
+    for function in generated:
+        assert not undefined_names(function), (function.name, undefined_names(function))
+
+
+def test_path_placeholders_use_sanitized_arguments():
+    source = generate_server()
+    assert 'f"https://api.example.com/v1/pet/{petid}"' in source
+    assert 'f"https://api.example.com/v1/items/{item_id}"' in source
+    # 'id' no path e na query: dois argumentos distintos, cada um enviado no lugar certo
+    assert "id: str, id_query: Optional[str] = None" in source
+    assert "params['id'] = id_query" in source
+    assert "params['from'] = from_param" in source
+    assert "params['filter[status]'] = filter_status" in source
+    assert "params['url'] = url_query" in source
+
+
+if __name__ == "__main__":
+    test_generated_server_compiles()
+    test_tools_only_use_defined_names()
+    test_path_placeholders_use_sanitized_arguments()
+    print("ok")
@@ -1,15 +1,52 @@
 import time
 import threading
+import select
+import socket
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Dict
-from database import get_pending_extractions, update_extraction_status, get_extraction
+from database import (claim_extractions, renew_leases, update_extraction_status, get_extraction,
+                      listen_extractions, save_extraction_progress, EXTRACTION_LEASE_SECONDS,
+                      LISTEN_CONFIGURED)
 from main import extract_complete_github_api
+from progress import ProgressTracker
 import os
 
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+# Com LISTEN ativo, a consulta periódica só cobre notificações perdidas e leases vencidos.
+# Sem LISTEN_DATABASE_URL o LISTEN passa pelo pooler padrão, que aceita o comando mas não
+# repassa notificações: nesse caso a consulta continua curta
+EXTRACTION_POLL_INTERVAL = float(os.getenv("EXTRACTION_POLL_INTERVAL",
+                                           "60" if LISTEN_CONFIGURED else "5"))
+CLAIM_BATCH_SIZE = 5
+# Extrações simultâneas por worker; cada uma abre conexões e disputa o pool do banco (máx. 20)
+EXTRACTION_MAX_CONCURRENT = int(os.getenv("EXTRACTION_MAX_CONCURRENT", "4"))
+# Limites por job (0 = sem limite)
+EXTRACTION_MAX_PAGES = int(os.getenv("EXTRACTION_MAX_PAGES", "2000")) or None
+EXTRACTION_MAX_BYTES = int(os.getenv("EXTRACTION_MAX_BYTES", str(200 * 1024 * 1024))) or None
+LISTEN_WAKEUP = 1.0  # intervalo máximo bloqueado no select antes de checar se o worker parou
+
 class ExtractionWorker:
-    def __init__(self, check_interval: int = 5):
-        self.check_interval = check_interval
+    def __init__(self, check_interval: int = 5, worker_id: str = WORKER_ID,
+                 lease_seconds: int = EXTRACTION_LEASE_SECONDS,
+                 poll_interval: float = EXTRACTION_POLL_INTERVAL,
+                 max_concurrent: int = EXTRACTION_MAX_CONCURRENT):
+        self.check_interval = check_interval  # usado quando LISTEN não está disponível
+        self.poll_interval = poll_interval
+        self.max_concurrent = max(1, max_concurrent)
+        self.executor = None
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
         self.running = False
+        self._stopped = threading.Event()
+        self._wakeup = threading.Event()  # vaga liberada ou job novo: reservar sem esperar o poll
+        # Mesmo sinal em forma de pipe, para acordar o select() do LISTEN na hora
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(self._wakeup_write, False)
         self.worker_thread = None
+        self.heartbeat_thread = None
         self.current_processing = set()
     
     def start(self):
@@ -17,47 +54,144 @@ class ExtractionWorker:
             return
         
         self.running = True
+        self._stopped.clear()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="extraction")
         self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
         self.worker_thread.start()
-        print("Extraction worker started")
+        self.heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        self.heartbeat_thread.start()
+        print(f"Extraction worker started ({self.worker_id})")
     
     def stop(self):
         self.running = False
+        self._stopped.set()
+        self._wake()
         if self.worker_thread:
             self.worker_thread.join(timeout=10)
+        if self.heartbeat_thread:
+            self.heartbeat_thread.join(timeout=10)
+        if self.executor:
+            # Jobs em andamento terminam; os que não terminarem têm o lease reassumido por outro worker
+            self.executor.shutdown(wait=False, cancel_futures=True)
         print("Extraction worker stopped")
     
+    def notify(self):
+        """Nova extração criada neste processo: reserva na hora, sem depender do NOTIFY"""
+        self._wake()
+    
+    def _wake(self):
+        self._wakeup.set()
+        try:
+            os.write(self._wakeup_write, b"\0")
+        except BlockingIOError:
+            pass  # pipe cheio: o worker já tem sinal pendente
+    
+    def _clear_wakeup(self):
+        self._wakeup.clear()
+        try:
+            while os.read(self._wakeup_read, 4096):
+                pass
+        except BlockingIOError:
+            pass
+    
+    def _heartbeat_loop(self):
+        # Renova os leases bem antes de vencerem, para outro worker não reassumir o job
+        interval = max(1, self.lease_seconds // 3)
+        while not self._stopped.wait(interval):
+            processing = list(self.current_processing)
+            if not processing:
+                continue
+            renewed = set(renew_leases(self.worker_id, processing, self.lease_seconds))
+            for extraction_id in processing:
+                if extraction_id not in renewed and extraction_id in self.current_processing:
+                    print(f"Lease of extraction {extraction_id} lost by worker {self.worker_id}")
+    
     def _worker_loop(self):
+        listener = None
+        next_listen = 0.0
+        
         while self.running:
             try:
-                pending = get_pending_extractions(limit=5)
+                self._clear_wakeup()
+                self._claim_available()
                 
-                for extraction in pending:
-                    extraction_id = extraction['id']
-                    
-                    if extraction_id in self.current_processing:
+                if listener is None and time.monotonic() >= next_listen:
+                    listener = listen_extractions()
+                    if listener is None:
+                        next_listen = time.monotonic() + self.poll_interval
+                    else:
+                        # Algo pode ter chegado antes do LISTEN: consulta de novo antes de bloquear
                         continue
-                    
-                    self.current_processing.add(extraction_id)
-                    thread = threading.Thread(
-                        target=self._process_extraction,
-                        args=(extraction,),
-                        daemon=True
-                    )
-                    thread.start()
                 
-                time.sleep(self.check_interval)
+                if listener is None:
+                    self._wakeup.wait(self.check_interval)
+                else:
+                    listener = self._wait_for_notification(listener)
             
             except Exception as e:
                 print(f"Error in worker loop: {e}")
-                time.sleep(self.check_interval)
+                self._stopped.wait(self.check_interval)
+        
+        if listener is not None:
+            listener.close()
+    
+    def _claim_available(self):
+        """Reserva extrações enquanto houver vaga no pool; cada lote cheio indica que pode haver mais
+
+        Só reserva o que pode rodar agora: o restante fica pendente para outras réplicas.
+        """
+        while self.running:
+            free = self.max_concurrent - len(self.current_processing)
+            if free <= 0:
+                return
+            limit = min(free, CLAIM_BATCH_SIZE)
+            claimed = claim_extractions(self.worker_id, limit=limit, lease_seconds=self.lease_seconds)
+            
+            for extraction in claimed:
+                extraction_id = extraction['id']
+                
+                if extraction_id in self.current_processing:
+                    continue
+                
+                self.current_processing.add(extraction_id)
+                self.executor.submit(self._process_extraction, extraction)
+            
+            if len(claimed) < limit:
+                return
+    
+    def _wait_for_notification(self, listener):
+        """Bloqueia até um NOTIFY, uma vaga liberada ou o poll de segurança, sem consultar o banco
+
+        Retorna a conexão de LISTEN, ou None se ela caiu (o loop reconecta).
+        """
+        deadline = time.monotonic() + self.poll_interval
+        while self.running and not self._wakeup.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return listener
+            try:
+                ready, _, _ = select.select([listener, self._wakeup_read], [], [],
+                                            min(remaining, LISTEN_WAKEUP))
+                if listener not in ready:
+                    continue
+                listener.poll()
+                if listener.notifies:
+                    listener.notifies.clear()
+                    return listener
+            except Exception as e:
+                print(f"LISTEN connection lost: {e}")
+                listener.close()
+                return None
+        return listener
     
     def _process_extraction(self, extraction: Dict):
         extraction_id = extraction['id']
+        # Gravado em lote no banco (no máximo uma vez por segundo) enquanto o job roda
+        progress = ProgressTracker(on_update=partial(save_extraction_progress, extraction_id))
         
         try:
-            print(f"Processing extraction {extraction_id}")
-            update_extraction_status(extraction_id, 'processing')
+            # claim_extractions já marcou a extração como 'processing' para este worker
+            print(f"Processing extraction {extraction_id} (attempt {extraction.get('attempts', 1)})")
             
             start_url = extraction['start_url']
             tool_name = extraction['tool_name']
@@ -69,7 +203,10 @@ class ExtractionWorker:
             result = extract_complete_github_api(
                 start_url=start_url,
                 tool_name=tool_name,
-                api_base_url=api_base_url
+                api_base_url=api_base_url,
+                max_pages=EXTRACTION_MAX_PAGES,
+                max_bytes=EXTRACTION_MAX_BYTES,
+                progress=progress
             )
             
             if isinstance(result, tuple):
@@ -79,27 +216,35 @@ class ExtractionWorker:
                 endpoint_count = None
             
             output_path = str(result_path)
+            progress.close("completed")
             
-            update_extraction_status(
+            updated = update_extraction_status(
                 extraction_id=extraction_id,
                 status='completed',
                 output_path=output_path,
-                endpoint_count=endpoint_count
+                endpoint_count=endpoint_count,
+                worker_id=self.worker_id
             )
             
-            print(f"Extraction {extraction_id} completed successfully: {output_path}")
+            if updated:
+                print(f"Extraction {extraction_id} completed successfully: {output_path}")
+            else:
+                print(f"Extraction {extraction_id} finished after its lease was taken over; result discarded")
         
         except Exception as e:
             error_message = str(e)
+            progress.close("failed")
             print(f"Error processing extraction {extraction_id}: {error_message}")
             update_extraction_status(
                 extraction_id=extraction_id,
                 status='failed',
-                error_message=error_message
+                error_message=error_message,
+                worker_id=self.worker_id
             )
         
         finally:
             self.current_processing.discard(extraction_id)
+            self._wake()
 
 worker = ExtractionWorker()
 